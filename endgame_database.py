@@ -1,148 +1,142 @@
-import itertools
-import numpy as np
+import argparse
+import os
 import sqlite3
+import struct
+from itertools import groupby, islice
+
 from joblib import Parallel, delayed
-from src.piece import Piece
-from src.board import Board
 
+from src.tablebase import (
+    DRAW, WIN, LOSS, dependencies, load_solution, material_signatures, save_solution, signature_name,
+    solution_path, solve_order, solve_signature, write_table,
+)
 
-# Define constants
-RED, BLACK= "R", "B"
-KING, MAN = "K", "M"
-EMPTY = None
-ROWS, COLS = 8, 8  # Assuming an 8x8 checkers board
+OUTCOME_LETTERS = {DRAW: "D", WIN: "W", LOSS: "L"}
 
-# Dummy imports - replace with actual imports from your project structure
-# from .board import Board
-# from .piece import Piece, RED, BLACK_PIECES
+# Rows written per transaction
+BATCH_SIZE = 10000
 
 
-class Piece:
-    def __init__(self, row, col, color, king=False):
-        self.row = row
-        self.col = col
-        self.color = color
-        self.king = king
-        print(
-            f"Initialized {self.color} piece at ({self.row}, {self.col}), King: {self.king}"
-        )
+def encode_position(red, black, kings, black_to_move):
+    """Pack a position as the `board_state` key: red, black and king masks, then the side to move."""
+    return struct.pack("<IIIB", red, black, kings, 1 if black_to_move else 0)
 
-    def make_king(self):
-        self.king = True
-        print(f"Piece at ({self.row}, {self.col}) promoted to King.")
-
-
-class Board:
-    def __init__(self):
-        self.board = [[None for _ in range(COLS)] for _ in range(ROWS)]
-        self.red_left = self.black_left = 12  # Assuming a standard game start
-        self.red_kings = self.black_kings = 0
-        self.initialize_pieces()
-
-    def clear_board(self):
-        self.board = [[None for _ in range(COLS)] for _ in range(ROWS)]
-
-    def place_piece(self, piece):
-        self.board[piece.row][piece.col] = piece
-
-    def evaluate(self):
-        # Calculate basic piece and king counts with weighted scores
-        piece_score = 0.1 * (
-            self.black_left - self.red_left
-        )  # Adjust weight for simple piece count
-        king_score = 2 * (
-            self.black_kings - self.red_kings
-        )  # Increased weight for kings
-
-        # Positional and mobility scoring
-        positional_score = 0
-        mobility_score = 0
-        for piece in self.get_all_pieces():
-            if piece.king:
-                # King positional advantage based on advancement
-                positional_score += (
-                    piece.row * 0.1
-                    if piece.color == BLACK
-                    else (ROWS - 1 - piece.row) * 0.1
-                )
-            else:
-                # Mobility score calculated from valid moves available
-                mobility_score += len(self.get_valid_moves(piece))
-
-            # Central control bonus for being in the middle of the board
-            if 2 <= piece.col <= 5 and 2 <= piece.row <= 5:
-                positional_score += 0.2  # More for center pieces
-
-        # Encourage maintaining pieces in the back row as a form of defense
-        back_row_defense = 0
-        for row in [0, ROWS - 1]:  # Assuming an 8-row board, adjust if different
-            for col in range(COLS):  # Assuming an 8-column board
-                piece = self.get_piece(row, col)
-                if piece and piece.color == BLACK and row == 0:
-                    back_row_defense += 0.5
-                elif piece and piece.color == RED and row == ROWS - 1:
-                    back_row_defense += 0.5
-
-        # Combine all scores into a final evaluation
-        total_score = (
-            piece_score
-            + king_score
-            + positional_score
-            + mobility_score
-            + back_row_defense
-        )
-        return total_score
+
+def _solve(signature, directory):
+    """Worker task: solve one signature against its saved dependencies and save the result."""
+    solved = {dep: load_solution(directory, dep) for dep in dependencies(signature)}
+    table = solve_signature(signature, solved)
+    save_solution(directory, table)
+    write_table(directory, table)
+    return signature
 
 
-def setup_specific_board(board, positions, types, colors):
-    board.clear_board()
-    for pos, type_, color in zip(positions, types, colors):
-        row, col = divmod(pos, COLS)
-        piece = Piece(row, col, color, king=(type_ == KING))
-        board.place_piece(piece)
-    return board
+def generate_tables(max_pieces, directory, n_jobs=-1, skip=()):
+    """
+    Solve every material signature with up to `max_pieces` pieces, saving each table to `directory`.
 
+    Signatures are solved level by level (see `solve_order`); the signatures of one
+    level do not depend on each other and are solved in parallel. Workers load the
+    tables they depend on from disk and only return the signature, so the parent
+    never holds more than one table at a time.
 
-def generate_and_analyze_configurations():
-    all_positions = list(itertools.combinations(range(ROWS * COLS), 6))
-    all_types = list(itertools.product([MAN, KING], repeat=6))
-    all_colors = list(itertools.product([RED, BLACK], repeat=6))
+    Args:
+        max_pieces (int): Largest number of pieces on the board.
+        directory (str): Where the solution and table files are written.
+        n_jobs (int): Number of joblib workers; -1 uses every CPU.
+        skip (set): Signatures already finished by an earlier run.
 
-    def process_configuration(positions, types, colors):
-        board = Board()
-        setup_specific_board(board, positions, types, colors)
-        outcome = board.evaluate()
-        board_state = np.array(
-            [[p.color if p else EMPTY for p in row] for row in board.board]
+    Yields:
+        Signature: Each signature as its level completes, in solving order.
+    """
+
+    for level, signatures in groupby(material_signatures(max_pieces), key=solve_order):
+        pending = [s for s in signatures if s not in skip]
+        unsolved = [s for s in pending if not os.path.exists(solution_path(directory, s))]
+        yield from (s for s in pending if s not in unsolved)
+        yield from Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(_solve)(signature, directory) for signature in unsolved
         )
-        return board_state.tobytes(), outcome
 
-    results = Parallel(n_jobs=-1)(
-        delayed(process_configuration)(pos, types, cols)
-        for pos, types, cols in itertools.product(all_positions, all_types, all_colors)
-    )
-    return results
+
+def table_rows(table):
+    """Yield `(board_state, outcome)` rows for every legal position of a table, e.g. outcome "W7" or "D"."""
+    for index, value in enumerate(table.values):
+        position = table.index.position(index)
+        if position is None:
+            continue
+        outcome = OUTCOME_LETTERS[value]
+        if value != DRAW:
+            outcome += str(table.distances[index])
+        yield encode_position(*position), outcome
 
 
-def store_results(db_path, data):
+def open_database(db_path):
+    """
+    Open the results database, creating its tables if needed.
+
+    The endgames table is keyed by the packed position, and the progress table
+    lists the signatures whose rows are completely stored.
+    """
+
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
         """CREATE TABLE IF NOT EXISTS endgames
-           (id INTEGER PRIMARY KEY, board_state BLOB, outcome TEXT)"""
-    )
-    cursor.executemany(
-        "INSERT INTO endgames (board_state, outcome) VALUES (?, ?)", data
+           (board_state BLOB PRIMARY KEY, outcome TEXT NOT NULL) WITHOUT ROWID"""
     )
+    conn.execute("CREATE TABLE IF NOT EXISTS progress (signature TEXT PRIMARY KEY)")
     conn.commit()
-    conn.close()
-
-
-def endgame():
-    db_path = "endgames.db"
-    results = generate_and_analyze_configurations()
-    store_results(db_path, results)
+    return conn
+
+
+def completed_signatures(conn, max_pieces):
+    """Return the signatures whose rows an earlier run already stored."""
+    done = {name for (name,) in conn.execute("SELECT signature FROM progress")}
+    return {s for s in material_signatures(max_pieces) if signature_name(s) in done}
+
+
+def store_results(conn, data, checkpoint=None):
+    """
+    Insert `(board_state, outcome)` rows from an iterable, BATCH_SIZE rows per transaction.
+
+    Args:
+        conn (sqlite3.Connection): Connection from `open_database`.
+        data (iterable): Rows to insert; consumed lazily.
+        checkpoint (str): Name recorded in the progress table together with the last batch.
+    """
+
+    rows = iter(data)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO endgames (board_state, outcome) VALUES (?, ?)", batch)
+            if len(batch) < BATCH_SIZE:
+                if checkpoint is not None:
+                    conn.execute("INSERT OR IGNORE INTO progress (signature) VALUES (?)", (checkpoint,))
+                return
+
+
+def endgame(max_pieces=4, db_path="endgames.db", n_jobs=-1, tablebase_dir="tablebases"):
+    conn = open_database(db_path)
+    try:
+        completed = completed_signatures(conn, max_pieces)
+        if completed:
+            print(f"Resuming: {len(completed)} signatures already stored.")
+        for signature in generate_tables(max_pieces, tablebase_dir, n_jobs, completed):
+            store_results(conn, table_rows(load_solution(tablebase_dir, signature)), signature_name(signature))
+            print(f"Stored {signature_name(signature)}")
+    finally:
+        conn.close()
     print("Endgame tablebase generation complete.")
 
+
 if __name__ == "__main__":
-    endgame()
+    parser = argparse.ArgumentParser(description="Solve endgames by retrograde analysis.")
+    parser.add_argument("--max-pieces", type=int, default=4)
+    parser.add_argument("--db", default="endgames.db")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--tablebase-dir", default="tablebases", help="Where the memory-mapped table files go")
+    args = parser.parse_args()
+    endgame(args.max_pieces, args.db, args.jobs, args.tablebase_dir)
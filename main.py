@@ -1,12 +1,11 @@
+import os
 import pygame
-from src.constant import FPS, BLACK_PIECES
+from src.book import BOOK_FILE
+from src.constant import FPS
 from src.game import Game
 from src.constant import WIDTH, HEIGHT, square_size
 from src.gui import GUI
-from src.ai import AI_agent
-
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Checkers")
+from src.background import BackgroundSearch
 
 def mouse_postion(pos):
     x, y = pos
@@ -17,10 +16,14 @@ def mouse_postion(pos):
 
 def main():
     pygame.init()
-    game = Game()
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Checkers")
+    game = Game(book_path=BOOK_FILE if os.path.exists(BOOK_FILE) else None)
+    game.load_history_scores()
     clock = pygame.time.Clock()
     run = True
-    gui = GUI(WIN, game)
+    gui = GUI(win, game)
+    engine = BackgroundSearch(game)
 
     while run:
 
@@ -28,15 +31,19 @@ def main():
             if event.type == pygame.QUIT:
                 run = False
             if (
-                event.type == pygame.MOUSEBUTTONDOWN
+                event.type == pygame.MOUSEBUTTONDOWN and game.turn != game.ai_color
             ):
                 pos = pygame.mouse.get_pos()
                 row, col = mouse_postion(pos)
                 gui.handle_click(row, col)
 
         if game.turn == game.ai_color:
-            game.agent_move()
-            pygame.time.delay(1000)  # Add a delay to make AI moves observable
+            # The search runs on a background thread; keep drawing until it is done
+            engine.think()
+            best_move = engine.poll()
+            if best_move is not None:
+                game.play_agent_move(best_move)
+                engine.ponder()
 
         if game.check_game_over():
             run = False
@@ -45,6 +52,8 @@ def main():
         pygame.display.flip()
         clock.tick(FPS)
 
+    engine.stop()
+    game.save_history_scores()
     pygame.quit()
 
 
@@ -1,43 +1,269 @@
+import time
 from copy import deepcopy
 from src.constant import BLACK_PIECES, RED
+from src.transposition import EXACT, LOWER, UPPER
+from src.zobrist import SIDE_KEY
 
+# Depth cap used when the search is limited by time instead of depth
+MAX_SEARCH_DEPTH = 64
 
-def iterative_deepening_minimax(board, max_depth, game):
+# Half-width of the root window around the previous iteration's score
+ASPIRATION_WINDOW = 50
+
+# How many nodes are searched between two looks at the clock
+CLOCK_CHECK_INTERVAL = 256
+
+# Most capture plies the quiescence search adds below the horizon
+QUIESCENCE_DEPTH = 8
+
+# Late-move reductions: from this remaining depth, quiet moves after the first
+# LMR_FULL_MOVES of a node are searched LMR_REDUCTION plies shallower first
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 3
+LMR_REDUCTION = 1
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when its deadline has passed or it was stopped."""
+
+
+class SearchControl:
+    """
+    Deadline and stop flag shared by all the nodes of one search.
+
+    minimax calls `check` at every node; the clock and the flag are only read every
+    CLOCK_CHECK_INTERVAL nodes to keep the check cheap. `stop` may be called from
+    another thread. The control also carries the optional SearchStats of the search.
+    """
+
+    def __init__(self, time_limit=None, stats=None):
+        """
+        Args:
+            time_limit (float): Seconds the search may run for, or None for no limit.
+            stats (SearchStats): Statistics the search counts into, or None to skip counting.
+        """
+
+        self.deadline = None
+        self.stopped = False
+        self.nodes = 0
+        self.stats = stats
+        if time_limit is not None:
+            self.set_time_limit(time_limit)
+
+    def set_time_limit(self, time_limit):
+        """Let the search run for `time_limit` more seconds from now."""
+        self.deadline = time.perf_counter() + time_limit
+
+    def stop(self):
+        """Ask the search to abort at its next check."""
+        self.stopped = True
+
+    def check(self):
+        """Count a node and raise SearchTimeout once the deadline has passed or `stop` was called."""
+        self.nodes += 1
+        if self.nodes % CLOCK_CHECK_INTERVAL == 0 and (
+            self.stopped or (self.deadline is not None and time.perf_counter() >= self.deadline)
+        ):
+            raise SearchTimeout
+
+
+def iterative_deepening_minimax(board, max_depth, game, time_limit=None, control=None, stats=None):
     """
     Perform an iterative deepening minimax algorithm on a game board.
 
+    Each iteration searches the previous iteration's best move first, inside an
+    aspiration window around its score, and its result replaces the previous one.
+    With a `time_limit` the search stops as soon as the time is up and the move of the
+    last completed iteration is returned; the first iteration always completes.
+
+    The root moves are ordered once, by `root_moves`, so every iteration tries them
+    in the same order apart from the previous best move.
+
+    The search makes and unmakes moves on `board` itself, which is left unchanged
+    afterwards; only the chosen move is applied to a copy of the board.
+
     Args:
         board (Board): The game board instance.
         max_depth (int): The maximum depth to explore in the minimax tree.
         game (Game): The current game context containing state and history.
+        time_limit (float): Optional wall-clock budget for the whole search, in seconds.
+        control (SearchControl): Optional control to stop the search from elsewhere; replaces `time_limit`.
+        stats (SearchStats): Optional statistics object, filled with one entry per iteration.
 
     Returns:
-        tuple: A tuple containing the best value (`best_val`) and the corresponding best move (`best_move`).
+        tuple: A tuple containing the best value (`best_val`) and the board after the best move (`best_move`).
     """
+    is_maximizing_player = game.get_current_turn() == BLACK_PIECES
+    if control is None:
+        control = SearchControl(time_limit)
+    if stats is None:
+        stats = control.stats
+    control.stats = stats
+    # The first iteration runs without a deadline, but is still counted when stats are kept
+    first_control = SearchControl(stats=stats) if stats is not None else None
     best_move = None
-    best_val = float("-inf") if game.get_current_turn() == BLACK_PIECES else float("inf")
+    best_val = float("-inf") if is_maximizing_player else float("inf")
+    game.transposition_table.new_search()
+    game.killer_moves.clear()
+    moves = root_moves(board, is_maximizing_player, game)
     for depth in range(1, max_depth + 1):
-        val, move = minimax(
-            board,
-            depth,
-            float("-inf"),
-            float("inf"),
-            game.get_current_turn() == BLACK_PIECES,
-            game,
-            max_depth,
+        if stats is not None:
+            stats.start_depth(depth, game.transposition_table)
+        try:
+            val, move = aspiration_search(
+                board,
+                depth,
+                best_val,
+                is_maximizing_player,
+                game,
+                max_depth,
+                control if depth > 1 else first_control,
+                best_move[4] if best_move else None,
+                moves,
+            )
+        except SearchTimeout:
+            if stats is not None:
+                stats.finish_depth(completed=False)
+            break
+        if stats is not None:
+            stats.current.score = val
+            stats.finish_depth()
+        best_val = val
+        best_move = move
+        if best_move is None:
+            break
+    if best_move is None:
+        return best_val, None
+    return best_val, apply_move(board, best_move)
+
+
+def aspiration_search(
+    board, depth, guess, is_maximizing_player, game, max_depth, control=None, first_move=None, moves=None
+):
+    """
+    Search the root inside a narrow window around `guess`, widening it on a fail.
+
+    Args:
+        board (Board): The current state of the board.
+        depth (int): The depth to search to.
+        guess (float): The score of the previous iteration.
+        is_maximizing_player (bool): True if the side to move is maximizing.
+        game (Game): The game instance containing game-specific logic and history.
+        max_depth (int): The maximum depth specified for the search.
+        control (SearchControl): Optional deadline checked during the search.
+        first_move (tuple): Move key to search first.
+        moves (list): Root moves in search order, as returned by `root_moves`; generated if None.
+
+    Returns:
+        tuple: The score and the best move as returned by `search_root`.
+    """
+
+    alpha, beta = float("-inf"), float("inf")
+    if guess not in (float("-inf"), float("inf")):
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+    while True:
+        val, move = search_root(
+            board, depth, alpha, beta, is_maximizing_player, game, max_depth, control, first_move, moves
         )
-        if (game.get_current_turn() == BLACK_PIECES and val > best_val) or (
-            game.get_current_turn() != BLACK_PIECES and val < best_val
-        ):
-            best_val = val
-            best_move = move
+        if val <= alpha and alpha != float("-inf"):
+            alpha = float("-inf")
+        elif val >= beta and beta != float("inf"):
+            beta = float("inf")
+        else:
+            return val, move
+
+
+def search_root(
+    board, depth, alpha, beta, is_maximizing_player, game, max_depth, control=None, first_move=None, moves=None
+):
+    """
+    Search every move of the root position and return the best one.
+
+    Args:
+        board (Board): The current state of the board.
+        depth (int): The depth to search to.
+        alpha (float): The alpha value for alpha-beta pruning.
+        beta (float): The beta value for alpha-beta pruning.
+        is_maximizing_player (bool): True if the side to move is maximizing.
+        game (Game): The game instance containing game-specific logic and history.
+        max_depth (int): The maximum depth specified for the search.
+        control (SearchControl): Optional deadline checked during the search.
+        first_move (tuple): Move key to search first; defaults to the transposition table move.
+        moves (list): Root moves in search order, as returned by `root_moves`; generated if None.
+
+    Returns:
+        tuple: The best score and the best move as returned by `get_all_moves`, or None if there is no move.
+    """
+
+    counts = control.stats.current if control is not None and control.stats is not None else None
+    if counts is not None:
+        counts.nodes += 1
+    if board.winner() is not None:
+        return board.evaluate(), None
+
+    table = game.transposition_table
+    key = board.hash ^ SIDE_KEY if is_maximizing_player else board.hash
+    if first_move is None:
+        entry = table.probe(key)
+        if entry is not None:
+            first_move = entry[3]
+    alpha_orig, beta_orig = alpha, beta
+
+    if moves is None:
+        move_data = generate_moves(board, BLACK_PIECES if is_maximizing_player else RED, game, first_move, depth)
+    else:
+        move_data = move_first(moves, first_move)
+    best_val = float("-inf") if is_maximizing_player else float("inf")
+    best_move = None
+    for index, move in enumerate(move_data):
+        piece, end_pos, skipped, _, move_key = move
+        undo = board.make_move(piece, end_pos, skipped)
+        try:
+            evaluation, _ = minimax(
+                board, depth - 1, alpha, beta, not is_maximizing_player, game, max_depth, control
+            )
+        finally:
+            board.unmake_move(undo)
+        if is_maximizing_player:
+            if evaluation > best_val:
+                best_val = evaluation
+                best_move = move
+            alpha = max(alpha, evaluation)
+        else:
+            if evaluation < best_val:
+                best_val = evaluation
+                best_move = move
+            beta = min(beta, evaluation)
+        if beta <= alpha:
+            if counts is not None:
+                counts.cutoffs += 1
+                counts.first_move_cutoffs += index == 0
+            update_history_score(game, best_move[4], depth, max_depth)
+            if not skipped:
+                game.killer_moves.add(depth, move_key)
+            break
+    store_result(table, key, depth, alpha_orig, beta_orig, best_val, best_move[4] if best_move else None)
     return best_val, best_move
 
 
-def minimax(board, depth, alpha, beta, is_maximizing_player, game, max_depth):
+def minimax(board, depth, alpha, beta, is_maximizing_player, game, max_depth, control=None):
     """
     Perform the minimax algorithm to find the best move for the current player.
 
+    Every child is searched by making the move on `board` and unmaking it afterwards,
+    so a single board is shared by the whole search. Results are cached in
+    `game.transposition_table`; a cached score is only reused at the same remaining
+    depth, so the scores are those of a plain fixed-depth search, while the cached
+    best move is tried first at any depth. Positions covered by `game.tablebase`
+    are scored from the tables without searching further. With `game.batch_evaluation`
+    set, the children of depth-1 nodes are evaluated together by `evaluate_children`.
+
+    Two switches on `game` trade exactness for depth: with `game.quiescence` the
+    horizon nodes are resolved by `quiescence` instead of being evaluated directly
+    (and the batch evaluation is skipped), and with `game.late_move_reductions` late
+    quiet moves are first searched LMR_REDUCTION plies shallower and only searched
+    again at full depth if they beat the current bound.
+
     Args:
         board (Board): The current state of the board.
         depth (int): The current depth in the minimax tree.
@@ -46,55 +272,307 @@ def minimax(board, depth, alpha, beta, is_maximizing_player, game, max_depth):
         is_maximizing_player (bool): True if the current player is maximizing; otherwise, False.
         game (Game): The game instance containing game-specific logic and history.
         max_depth (int): The maximum depth specified for the search.
+        control (SearchControl): Optional deadline; SearchTimeout is raised once it passes, with the board restored.
 
     Returns:
-        tuple: A tuple containing the evaluation score of the board and the board configuration after the best move.
+        tuple: A tuple containing the evaluation score of the board and the best move as returned by `get_all_moves`.
     """
 
-    if depth == 0 or board.winner() is not None:
+    counts = None
+    if control is not None:
+        control.check()
+        if control.stats is not None:
+            counts = control.stats.current
+            counts.nodes += 1
+
+    if board.winner() is not None:
+        if counts is not None:
+            counts.leaves += 1
+            counts.evaluations += 1
         return board.evaluate(), None
+    if game.tablebase is not None:
+        score = game.tablebase.score(board, is_maximizing_player)
+        if score is not None:
+            if counts is not None:
+                counts.leaves += 1
+            return score, None
+    if depth == 0:
+        if game.quiescence:
+            return quiescence(board, alpha, beta, is_maximizing_player, game, control), None
+        if counts is not None:
+            counts.leaves += 1
+            counts.evaluations += 1
+        return board.evaluate(), None
+
+    table = game.transposition_table
+    key = board.hash ^ SIDE_KEY if is_maximizing_player else board.hash
+    entry = table.probe(key)
+    hash_move = None
+    if entry is not None:
+        entry_depth, bound, score, hash_move = entry
+        if entry_depth == depth:
+            if bound == EXACT:
+                return score, None
+            elif bound == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score, None
+    alpha_orig, beta_orig = alpha, beta
 
-    move_data = get_all_moves(
-        board, BLACK_PIECES if is_maximizing_player else RED, game
+    move_data = generate_moves(
+        board, BLACK_PIECES if is_maximizing_player else RED, game, hash_move, depth
     )
     best_move = None
     best_move_details = None
+    frontier_scores = None
+    if depth == 1 and game.batch_evaluation and not game.quiescence:
+        move_data = list(move_data)
+        if move_data:
+            frontier_scores = evaluate_children(board, move_data, is_maximizing_player, game, control)
+    reduce = game.late_move_reductions and depth >= LMR_MIN_DEPTH
+    killers = game.killer_moves.get(depth) if reduce else ()
 
     if is_maximizing_player:
         max_eval = float("-inf")
-        for new_board, move_details, _, move_key in move_data:
-            evaluation, _ = minimax(
-                new_board, depth - 1, alpha, beta, False, game, max_depth
-            )
+        for index, move in enumerate(move_data):
+            piece, end_pos, skipped, _, move_key = move
+            if frontier_scores is not None:
+                evaluation = frontier_scores[index]
+            else:
+                undo = board.make_move(piece, end_pos, skipped)
+                try:
+                    if reduce and index >= LMR_FULL_MOVES and not skipped and move_key not in killers:
+                        evaluation, _ = minimax(
+                            board, depth - 1 - LMR_REDUCTION, alpha, beta, False, game, max_depth, control
+                        )
+                        # Search the move again at full depth if it still looks good
+                        if evaluation > alpha:
+                            evaluation, _ = minimax(
+                                board, depth - 1, alpha, beta, False, game, max_depth, control
+                            )
+                    else:
+                        evaluation, _ = minimax(
+                            board, depth - 1, alpha, beta, False, game, max_depth, control
+                        )
+                finally:
+                    board.unmake_move(undo)
             if evaluation > max_eval:
                 max_eval = evaluation
-                best_move = new_board
+                best_move = move
                 best_move_details = move_key
             alpha = max(alpha, evaluation)
             if beta <= alpha:
+                if counts is not None:
+                    counts.cutoffs += 1
+                    counts.first_move_cutoffs += index == 0
                 if best_move_details:
                     update_history_score(game, best_move_details, depth, max_depth)
+                    if not skipped:
+                        game.killer_moves.add(depth, move_key)
                 break
+        store_result(table, key, depth, alpha_orig, beta_orig, max_eval, best_move_details)
         return max_eval, best_move
     else:
         min_eval = float("inf")
-        for new_board, move_details, _, move_key in move_data:
-            evaluation, _ = minimax(
-                new_board, depth - 1, alpha, beta, True, game, max_depth
-            )
+        for index, move in enumerate(move_data):
+            piece, end_pos, skipped, _, move_key = move
+            if frontier_scores is not None:
+                evaluation = frontier_scores[index]
+            else:
+                undo = board.make_move(piece, end_pos, skipped)
+                try:
+                    if reduce and index >= LMR_FULL_MOVES and not skipped and move_key not in killers:
+                        evaluation, _ = minimax(
+                            board, depth - 1 - LMR_REDUCTION, alpha, beta, True, game, max_depth, control
+                        )
+                        # Search the move again at full depth if it still looks good
+                        if evaluation < beta:
+                            evaluation, _ = minimax(
+                                board, depth - 1, alpha, beta, True, game, max_depth, control
+                            )
+                    else:
+                        evaluation, _ = minimax(
+                            board, depth - 1, alpha, beta, True, game, max_depth, control
+                        )
+                finally:
+                    board.unmake_move(undo)
             if evaluation < min_eval:
                 min_eval = evaluation
-                best_move = new_board
+                best_move = move
                 best_move_details = move_key
             beta = min(beta, evaluation)
             if beta <= alpha:
+                if counts is not None:
+                    counts.cutoffs += 1
+                    counts.first_move_cutoffs += index == 0
                 if best_move_details:
                     update_history_score(game, best_move_details, depth, max_depth)
+                    if not skipped:
+                        game.killer_moves.add(depth, move_key)
                 break
+        store_result(table, key, depth, alpha_orig, beta_orig, min_eval, best_move_details)
         return min_eval, best_move
 
 
-def get_all_moves(board, color, game):
+def quiescence(board, alpha, beta, is_maximizing_player, game, control=None, depth=QUIESCENCE_DEPTH):
+    """
+    Search only captures below the horizon, so leaves are scored in quiet positions.
+
+    Captures are not forced, so the side to move may always stop capturing: the
+    position's own evaluation ("stand pat") bounds its score from below for the
+    maximizer and from above for the minimizer. The node itself is counted by the
+    caller; its capture children are counted here.
+
+    Args:
+        board (Board): The position at the horizon; captures are made and unmade on it.
+        alpha (float): The alpha value for alpha-beta pruning.
+        beta (float): The beta value for alpha-beta pruning.
+        is_maximizing_player (bool): True if the side to move is maximizing.
+        game (Game): Supplies the tablebase.
+        control (SearchControl): Optional deadline checked at every capture child.
+        depth (int): Capture plies still allowed.
+
+    Returns:
+        float: The score of the position once the captures have been played out.
+    """
+
+    counts = control.stats.current if control is not None and control.stats is not None else None
+    stand_pat = board.evaluate()
+    if counts is not None:
+        counts.evaluations += 1
+    captures = None
+    if depth > 0 and board.winner() is None and (stand_pat < beta if is_maximizing_player else stand_pat > alpha):
+        captures = capture_moves(board, BLACK_PIECES if is_maximizing_player else RED)
+    if not captures:
+        if counts is not None:
+            counts.leaves += 1
+        return stand_pat
+
+    best = stand_pat
+    if is_maximizing_player:
+        alpha = max(alpha, stand_pat)
+    else:
+        beta = min(beta, stand_pat)
+    for piece, end_pos, skipped in captures:
+        if control is not None:
+            control.check()
+            if counts is not None:
+                counts.nodes += 1
+        undo = board.make_move(piece, end_pos, skipped)
+        try:
+            score = None
+            if game.tablebase is not None and board.winner() is None:
+                score = game.tablebase.score(board, not is_maximizing_player)
+            if score is None:
+                score = quiescence(board, alpha, beta, not is_maximizing_player, game, control, depth - 1)
+        finally:
+            board.unmake_move(undo)
+        if is_maximizing_player:
+            best = max(best, score)
+            alpha = max(alpha, score)
+        else:
+            best = min(best, score)
+            beta = min(beta, score)
+        if beta <= alpha:
+            if counts is not None:
+                counts.cutoffs += 1
+            break
+    return best
+
+
+def capture_moves(board, color):
+    """
+    Return the captures of `color`, most pieces taken first.
+
+    Returns:
+        list: `(piece, end_pos, skipped)` tuples.
+    """
+
+    captures = [
+        (piece, end_pos, skipped)
+        for piece in board.capturing_pieces(color)
+        for end_pos, skipped in board.get_valid_moves(piece).items()
+        if skipped
+    ]
+    captures.sort(key=lambda move: len(move[2]), reverse=True)
+    return captures
+
+
+def evaluate_children(board, moves, is_maximizing_player, game, control=None):
+    """
+    Score every child of a depth-1 node in one vectorized batch.
+
+    Each child gets the score minimax would return for it at depth 0: its tablebase
+    score if it has one, its evaluation otherwise.
+
+    Args:
+        board (Board): The parent position; every move is made and unmade on it.
+        moves (list): The moves as returned by `get_all_moves`.
+        is_maximizing_player (bool): True if the parent's side to move is maximizing.
+        game (Game): Supplies the tablebase.
+        control (SearchControl): Optional deadline, checked once per child as minimax does.
+
+    Returns:
+        list: The score of each child, in the order of `moves`.
+    """
+
+    # NumPy is only loaded once a search uses batch evaluation
+    from src.batch_eval import encode_position, evaluate_positions, stack_positions
+
+    scores = [None] * len(moves)
+    encoded = []
+    for index, (piece, end_pos, skipped, _, _) in enumerate(moves):
+        if control is not None:
+            control.check()
+        undo = board.make_move(piece, end_pos, skipped)
+        try:
+            if game.tablebase is not None and board.winner() is None:
+                scores[index] = game.tablebase.score(board, not is_maximizing_player)
+            encoded.append(encode_position(board))
+        finally:
+            board.unmake_move(undo)
+    evaluations = evaluate_positions(*stack_positions(encoded)).tolist()
+    if control is not None and control.stats is not None:
+        counts = control.stats.current
+        counts.nodes += len(moves)
+        counts.leaves += len(moves)
+        counts.evaluations += scores.count(None)
+    return [evaluation if score is None else score for score, evaluation in zip(scores, evaluations)]
+
+
+def store_result(table, key, depth, alpha, beta, score, move_key):
+    """
+    Save a search result in the transposition table with the bound it represents.
+
+    Args:
+        table (TranspositionTable): The table to write to.
+        key (int): The Zobrist key of the position and side to move.
+        depth (int): The remaining depth of the search.
+        alpha (float): The alpha value the node was searched with.
+        beta (float): The beta value the node was searched with.
+        score (float): The score returned by the node.
+        move_key (tuple): The best move found, if any.
+    """
+
+    if score <= alpha:
+        bound = UPPER
+    elif score >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table.store(key, depth, bound, score, move_key)
+
+
+def generate_moves(board, color, game, hash_move=None, depth=None):
+    """Return the moves of a search node, staged by `order_moves` or, with `game.staged_ordering` off, by `get_all_moves`."""
+    if game.staged_ordering:
+        return order_moves(board, color, game, hash_move, depth)
+    return get_all_moves(board, color, game, hash_move)
+
+
+def get_all_moves(board, color, game, hash_move=None):
     """
     Generate all possible moves for the given color on the board.
 
@@ -102,36 +580,179 @@ def get_all_moves(board, color, game):
         board (Board): The current state of the game board.
         color (str): The color of the pieces for which to generate moves.
         game (Game): The game instance to access historical scores and other game-specific details.
+        hash_move (tuple): Optional move key from the transposition table to search first.
 
     Returns:
-        list: A list of tuples, each representing a potential move and its details including the new board state, move details, historical score, and move key.
+        list: A list of tuples `(piece, end_pos, skipped, move_score, move_key)`, one per legal move, ordered by historical score.
     """
 
     moves = []
+    history = game.history_scores.scores
     for piece in board.get_pieces_by_color(color):
         valid_moves = board.get_valid_moves(piece)
+        # History index of the move is from_square * 32 + to_square, as in encode_move
+        from_index = (piece.row * 4 + piece.col // 2) * 32
         for move, skipped in valid_moves.items():
-            temp_board = deepcopy(board)
-            temp_piece = temp_board.get_piece(piece.row, piece.col)
-            new_board = simulate_move(temp_piece, move, temp_board, skipped)
-            # Append both the new board and the move details
-            move_details = (
-                (piece.row, piece.col),
-                move,
-            )  # move is typically the end position
             move_key = (
                 piece.row,
                 piece.col,
                 move[0],
                 move[1],
             )  # Create a unique key for the move
-            move_score = game.history_scores.get(move_key, 0)
-            moves.append((new_board, move_details, move_score, move_key))
+            move_score = history[from_index + move[0] * 4 + move[1] // 2]
+            moves.append((piece, move, skipped, move_score, move_key))
     # Sort based on the history heuristic score
-    moves.sort(key=lambda x: x[2], reverse=True)
+    moves.sort(key=lambda x: x[3], reverse=True)
+    if hash_move is not None:
+        for index, move in enumerate(moves):
+            if move[4] == hash_move:
+                moves.insert(0, moves.pop(index))
+                break
+    return moves
+
+
+def order_moves(board, color, game, hash_move=None, depth=None):
+    """
+    Yield the moves of `color` in the order the search tries them, one stage at a time.
+
+    The stages are: the hash move, captures by the number of pieces taken, the
+    killer moves of `depth`, then the remaining quiet moves by history score. Each
+    stage generates its own moves only when the search gets to it: the hash move and
+    the killers are checked against the moves of their piece alone, captures are
+    only generated for the pieces that have one, and the quiet moves are generated
+    and scored last. After an early cutoff the rest of the node is never generated.
+
+    Args:
+        board (Board): The current state of the game board.
+        color (tuple): The color of the pieces to move.
+        game (Game): Supplies the history scores and the killer moves.
+        hash_move (tuple): Optional move key from the transposition table to search first.
+        depth (int): Remaining depth of the node, used to look up its killer moves.
+
+    Yields:
+        tuple: Moves as returned by `get_all_moves`; only the quiet moves carry their history score.
+    """
+
+    killers = game.killer_moves.get(depth)
+    if hash_move is not None:
+        move = _legal_move(board, color, hash_move)
+        if move is not None:
+            yield move
+
+    captures = [
+        (piece, end_pos, skipped, 0, (piece.row, piece.col, end_pos[0], end_pos[1]))
+        for piece in board.capturing_pieces(color)
+        for end_pos, skipped in board.get_valid_moves(piece).items()
+        if skipped
+    ]
+    if len(captures) > 1:
+        captures.sort(key=lambda move: len(move[2]), reverse=True)
+    for move in captures:
+        if move[4] != hash_move:
+            yield move
+
+    for killer in killers:
+        if killer != hash_move:
+            move = _legal_move(board, color, killer)
+            if move is not None:
+                yield move
+
+    history = game.history_scores.scores
+    quiet = []
+    for piece in board.get_pieces_by_color(color):
+        # History index of the move is from_square * 32 + to_square, as in encode_move
+        from_index = (piece.row * 4 + piece.col // 2) * 32
+        for end_pos, skipped in board.get_valid_moves(piece).items():
+            if skipped:
+                continue
+            move_key = (piece.row, piece.col, end_pos[0], end_pos[1])
+            if move_key != hash_move and move_key not in killers:
+                quiet.append((piece, end_pos, skipped, history[from_index + end_pos[0] * 4 + end_pos[1] // 2], move_key))
+    quiet.sort(key=lambda move: move[3], reverse=True)
+    yield from quiet
+
+
+def root_moves(board, is_maximizing_player, game):
+    """
+    Order the moves of the root position once for a whole search.
+
+    The order comes from the history scores as they are when the search starts, so
+    it does not depend on the history updates of earlier iterations. A serial and a
+    root-parallel search of the same position therefore try the root moves in the
+    same order and pick the same one among moves of equal score.
+
+    Args:
+        board (Board): The root position.
+        is_maximizing_player (bool): True if the side to move is maximizing.
+        game (Game): Supplies the history scores and the ordering settings.
+
+    Returns:
+        list: Moves as returned by `get_all_moves`, captures first with staged ordering.
+    """
+
+    return list(generate_moves(board, BLACK_PIECES if is_maximizing_player else RED, game))
+
+
+def move_first(moves, move_key):
+    """Return `moves` with the move of `move_key` moved to the front, if it is one of them."""
+    for index, move in enumerate(moves):
+        if move[4] == move_key:
+            return [move] + moves[:index] + moves[index + 1:]
     return moves
 
 
+def _legal_move(board, color, move_key):
+    """Return the move of `move_key` as `get_all_moves` would, or None if it is not legal for `color`."""
+    piece = board.get_piece(move_key[0], move_key[1])
+    if piece is None or piece.color != color:
+        return None
+    skipped = board.get_valid_moves(piece).get((move_key[2], move_key[3]))
+    if skipped is None:
+        return None
+    return (piece, (move_key[2], move_key[3]), skipped, 0, move_key)
+
+
+def expected_move(board, is_maximizing_player, game):
+    """
+    Return the move the last search expects to be played from `board`.
+
+    Args:
+        board (Board): The position to look up.
+        is_maximizing_player (bool): True if the side to move is maximizing.
+        game (Game): The game instance holding the transposition table.
+
+    Returns:
+        tuple: The stored best move as returned by `get_all_moves`, or None if the position is not stored.
+    """
+
+    entry = game.transposition_table.probe(board.hash ^ SIDE_KEY if is_maximizing_player else board.hash)
+    if entry is None or entry[3] is None:
+        return None
+    for move in get_all_moves(board, BLACK_PIECES if is_maximizing_player else RED, game):
+        if move[4] == entry[3]:
+            return move
+    return None
+
+
+def apply_move(board, move):
+    """
+    Return a copy of the board with a move from `get_all_moves` played on it.
+
+    Args:
+        board (Board): The board the move was generated on.
+        move (tuple): A move tuple as returned by `get_all_moves`.
+
+    Returns:
+        Board: A new board with the move applied; `board` itself is not modified.
+    """
+
+    piece, end_pos, skipped, _, _ = move
+    new_board = deepcopy(board)
+    new_piece = new_board.get_piece(piece.row, piece.col)
+    new_skipped = [new_board.get_piece(p.row, p.col) for p in skipped]
+    return simulate_move(new_piece, end_pos, new_board, new_skipped)
+
+
 def update_history_score(game, move_key, depth, max_depth):
     """
     Update the historical score for a particular move based on its depth in the game tree.
@@ -145,7 +766,7 @@ def update_history_score(game, move_key, depth, max_depth):
 
     # Higher score increment for moves closer to the root
     depth_weight = max_depth - depth + 1
-    game.history_scores[move_key] = game.history_scores.get(move_key, 0) + depth_weight
+    game.history_scores.add(move_key, depth_weight)
 
 
 def decay_history_scores(game):
@@ -156,9 +777,7 @@ def decay_history_scores(game):
         game (Game): The game instance containing the history scores to be decayed.
     """
 
-    decay_factor = 0.99  # Decay scores by 1%
-    for key in game.history_scores:
-        game.history_scores[key] *= decay_factor
+    game.history_scores.decay(0.99)  # Decay scores by 1%
 
 
 def normalize_history_scores(game):
@@ -169,9 +788,7 @@ def normalize_history_scores(game):
         game (Game): The game instance where the history scores are kept.
     """
 
-    max_score = max(game.history_scores.values(), default=1)  # Avoid division by zero
-    for key in game.history_scores:
-        game.history_scores[key] /= max_score
+    game.history_scores.normalize()
 
 
 def simulate_move(piece, move, board, skipped):
@@ -6,7 +6,7 @@ class AI_agent:
         self.depth = depth
 
     def minimax(self, game, depth, alpha, beta, maximizing_player):
-        if depth == 0 or game.check_game_over():
+        if depth == 0 or game.board.winner() is not None:
             return self.evaluate(game.board), None
 
         best_move = None
@@ -15,12 +15,10 @@ class AI_agent:
             ai_pieces = game.board.get_pieces_by_color(self.color)
             for piece in ai_pieces:
                 current_valid_moves = game.board.get_valid_moves(piece)
-                print(len(current_valid_moves))
                 if not current_valid_moves:
                     continue
                 for pos in current_valid_moves:
-                    simulated_game = game.deep_copy()
-                    simulated_game.board.move_piece(piece, pos)
+                    simulated_game = self.simulate(game, piece, pos, current_valid_moves[pos])
 
                     eval = self.minimax(simulated_game, depth - 1, alpha, beta, False)[0]
                     if eval > max_eval:
@@ -38,8 +36,7 @@ class AI_agent:
                 if not current_opponent_valid_moves:
                     continue
                 for pos in current_opponent_valid_moves:
-                    simulated_game = game.deep_copy()
-                    simulated_game.board.move_piece(piece, pos)
+                    simulated_game = self.simulate(game, piece, pos, current_opponent_valid_moves[pos])
                     eval = self.minimax(simulated_game, depth - 1, alpha, beta, True)[0]
                     if eval < min_eval:
                         min_eval = eval
@@ -49,9 +46,17 @@ class AI_agent:
                         break
             return min_eval, best_move
 
+    def simulate(self, game, piece, pos, captured):
+        """Return a copy of the game with the move played, leaving `game` and `piece` untouched."""
+        simulated_game = game.deep_copy()
+        board = simulated_game.board
+        board.move_piece(board.get_piece(piece.row, piece.col), pos)
+        board.remove([board.get_piece(p.row, p.col) for p in captured])
+        return simulated_game
+
     def evaluate(self, board):
-        # Directly call the board's evaluate method
-        return board.evaluate()
+        # Board.evaluate scores from black's side
+        return board.evaluate() if self.color == BLACK_PIECES else -board.evaluate()
 
     def choose_move(self, game):
         _, best_move = self.minimax(
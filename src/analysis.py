@@ -0,0 +1,257 @@
+"""
+Bulk analysis of positions on a process pool.
+
+Positions are read from a file in the notation of src.notation, one per line,
+searched with iterative deepening in a pool of worker processes and written to a
+JSON lines file in input order, one record per position: its index and position,
+the score (black positive, null when the side to move has no move), the best move
+in 0-31 square numbers, the deepest completed iteration, the nodes searched and
+the time taken. A position that cannot be read gets an "error" record instead.
+
+The input is streamed and only a bounded number of positions is in flight at a
+time, so files of any size can be analysed. Every record is flushed as soon as
+it is written; with --resume the positions already in the output file are skipped.
+
+Usage:
+    python -m src.analysis positions.txt --depth 8 --output analysis.jsonl
+    python -m src.analysis positions.txt --time 0.5 --engine bitboard,quiescence --workers 8 --resume
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.agent import MAX_SEARCH_DEPTH, SearchControl, iterative_deepening_minimax
+from src.bitboard import BitBoard
+from src.board import Board
+from src.notation import from_notation
+from src.stats import SearchStats
+from src.tournament import describe_move, parse_engine
+
+# Positions submitted to the pool per worker before waiting for results
+IN_FLIGHT_PER_WORKER = 4
+
+# Per-process engine, set up once by _init_worker
+_worker_game = None
+_worker_spec = None
+
+
+def analyse_position(spec, game, index, position):
+    """
+    Search one position.
+
+    The history scores and the transposition table are cleared first, so a
+    fixed-depth result does not depend on the positions searched before it.
+
+    Args:
+        spec (EngineSpec): Search settings; `depth` is used unless `time_limit` is set.
+        game (Game): The engine's game, created by `spec.create_game()`.
+        index (int): Index of the position in the input.
+        position (str): The position in notation.
+
+    Returns:
+        dict: The record written for the position.
+    """
+
+    record = {"index": index, "position": position}
+    try:
+        board, turn = from_notation(position, BitBoard if spec.use_bitboard else Board)
+    except ValueError as error:
+        record["error"] = str(error)
+        return record
+
+    game.turn = turn
+    game.history_scores.clear()
+    game.transposition_table.clear()
+    stats = SearchStats()
+    depth = spec.depth if spec.time_limit is None else MAX_SEARCH_DEPTH
+    start = time.perf_counter()
+    score, best_move = iterative_deepening_minimax(board, depth, game, control=SearchControl(spec.time_limit), stats=stats)
+    record["score"] = score if math.isfinite(score) else None
+    record["best_move"] = describe_move(board, best_move, turn)[0] if best_move is not None else None
+    record["depth"] = sum(1 for iteration in stats.depths if iteration.completed)
+    record["nodes"] = stats.total_nodes()
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _init_worker(spec):
+    global _worker_game, _worker_spec
+    _worker_spec = spec
+    _worker_game = spec.create_game()
+
+
+def _analyse(index, position):
+    return analyse_position(_worker_spec, _worker_game, index, position)
+
+
+def read_positions(path, skip=0):
+    """
+    Stream the positions of an input file, skipping blank lines.
+
+    Args:
+        path (str): One position per line.
+        skip (int): Number of positions to skip from the start.
+
+    Yields:
+        tuple: `(index, position)` pairs, the index counting the positions from 0.
+    """
+
+    index = 0
+    with open(path) as file:
+        for line in file:
+            position = line.strip()
+            if not position:
+                continue
+            if index >= skip:
+                yield index, position
+            index += 1
+
+
+def completed_records(path):
+    """
+    Count the records of an output file that were written completely.
+
+    A last line cut short by an interrupted run is removed from the file.
+
+    Args:
+        path (str): A JSON lines file written by `analyse_file`; it may not exist.
+
+    Returns:
+        tuple: The number of complete records and the last of them, or `(0, None)`.
+    """
+
+    if not os.path.exists(path):
+        return 0, None
+    count = 0
+    last = None
+    end = 0
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            count += 1
+            last = record
+            end += len(line)
+    if end != os.path.getsize(path):
+        with open(path, "r+b") as file:
+            file.truncate(end)
+    return count, last
+
+
+def analyse_file(spec, input_path, output_path, workers=None, resume=False, report=print, report_every=100):
+    """
+    Analyse every position of an input file and write the records in input order.
+
+    At most IN_FLIGHT_PER_WORKER positions per worker are submitted or waiting to be
+    written at any time; a slow position holds back the submissions rather than
+    letting finished records pile up.
+
+    Args:
+        spec (EngineSpec): Search settings of every position.
+        input_path (str): Positions in notation, one per line.
+        output_path (str): JSON lines file the records are appended to.
+        workers (int): Worker processes; defaults to the number of CPUs.
+        resume (bool): Skip the positions that already have a record in `output_path`;
+            otherwise the file is started afresh.
+        report (callable): Called with one line of progress text.
+        report_every (int): Records between two progress lines.
+
+    Returns:
+        int: The number of records written by this run.
+
+    Raises:
+        ValueError: If `output_path` does not hold the records of the first positions of `input_path`.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    skip = 0
+    if resume:
+        skip, last = completed_records(output_path)
+        if last is not None and (last.get("index") != skip - 1 or last.get("position") != _position_at(input_path, skip - 1)):
+            raise ValueError(f"{output_path} was not written from {input_path}")
+        if skip:
+            report(f"resuming after {skip} positions")
+
+    positions = read_positions(input_path, skip)
+    written = 0
+    next_index = skip
+    finished = {}
+    start = time.perf_counter()
+    with open(output_path, "a" if resume else "w", buffering=1) as output, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(spec,)) as executor:
+        pending = set()
+        submitted = skip
+        while True:
+            while submitted - next_index < IN_FLIGHT_PER_WORKER * workers:
+                task = next(positions, None)
+                if task is None:
+                    break
+                pending.add(executor.submit(_analyse, *task))
+                submitted += 1
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                finished[record["index"]] = record
+            while next_index in finished:
+                output.write(json.dumps(finished.pop(next_index), separators=(",", ":")) + "\n")
+                next_index += 1
+                written += 1
+                if written % report_every == 0:
+                    report(progress_line(written, time.perf_counter() - start))
+    report(progress_line(written, time.perf_counter() - start))
+    return written
+
+
+def _position_at(path, index):
+    return next(read_positions(path, index), (None, None))[1]
+
+
+def progress_line(written, seconds):
+    return f"positions {written}  {written / max(seconds, 1e-9):.1f} positions/s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="File of positions in notation, one per line")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSON lines file receiving the records")
+    parser.add_argument("--depth", type=int, default=6, help="Fixed search depth")
+    parser.add_argument("--time", type=float, help="Seconds per position; replaces --depth")
+    parser.add_argument("--engine", default="",
+                        help="Further search options as in src.tournament, e.g. bitboard,quiescence,lmr")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--resume", action="store_true", help="Keep the records in --output and analyse the rest")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = parse_engine(f"analysis:{args.engine}")
+    except ValueError as error:
+        parser.error(str(error))
+    if spec.agent != "minimax":
+        parser.error("positions are analysed with the minimax engine")
+    spec.depth = args.depth
+    spec.time_limit = args.time
+    spec.book_path = None  # Analysis always searches
+    try:
+        analyse_file(spec, args.input, args.output, args.workers, args.resume)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print(f"interrupted; run again with --resume to continue {args.output}", file=sys.stderr)
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Position statistics mined from archives of played games.
+
+Ingestion streams PDN files game by game, replays every game through the Board
+rules and counts, for each distinct position a game reaches, whether the side to
+move in it went on to win, draw or lose. Games are replayed in a process pool in
+chunks; each chunk is reduced to one count per position before it comes back,
+and the counts are merged into an SQLite table keyed by the position key of
+src.book, so that a lookup is a primary key search.
+
+Usage:
+    python -m src.archive ingest games.pdn more.pdn --db positions.db --workers 8
+    python -m src.archive lookup "r:rrrrrrrrrrrr........bbbbbbbbbbbb" --db positions.db
+    python -m src.archive top --db positions.db --min-games 100
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.book import position_key
+from src.constant import RED
+from src.notation import from_notation, to_notation
+from src.pdn import IllegalMove, first_player_score, read_games, replay
+
+POSITIONS_DB = "positions.db"
+
+# Games replayed per task, and tasks per worker in flight at a time
+CHUNK_GAMES = 500
+IN_FLIGHT_PER_WORKER = 2
+
+# Positions counted in memory before they are merged into the database
+FLUSH_POSITIONS = 500_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER PRIMARY KEY,
+    position TEXT NOT NULL,
+    wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    losses INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO positions (key, position, wins, draws, losses) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    wins = wins + excluded.wins, draws = draws + excluded.draws, losses = losses + excluded.losses
+"""
+
+
+def _signed(key):
+    """Map a 64-bit position key onto SQLite's signed 64-bit integers."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class PositionStore:
+    """
+    Win, draw and loss counts per position in an SQLite database.
+
+    Counts are from the point of view of the side to move in the position.
+    """
+
+    def __init__(self, path=POSITIONS_DB):
+        """
+        Args:
+            path (str): The database file; it is created if it does not exist.
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, counts):
+        """
+        Add counts to the stored ones in a single transaction.
+
+        Args:
+            counts (dict): Position keys mapped to `[position, wins, draws, losses]`.
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                _UPSERT, ((_signed(key), *values) for key, values in counts.items())
+            )
+
+    def lookup(self, board, turn):
+        """
+        Return the counts of a position.
+
+        Returns:
+            tuple: `(wins, draws, losses)` for the side to move, or None if no game reached the position.
+        """
+
+        return self.connection.execute(
+            "SELECT wins, draws, losses FROM positions WHERE key = ?", (_signed(position_key(board, turn)),)
+        ).fetchone()
+
+    def most_played(self, min_games=1, limit=None):
+        """
+        Return the positions reached by at least `min_games` games, most played first.
+
+        Returns:
+            list: `(position, wins, draws, losses)` rows.
+        """
+
+        query = (
+            "SELECT position, wins, draws, losses FROM positions WHERE wins + draws + losses >= ? "
+            "ORDER BY wins + draws + losses DESC"
+        )
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self.connection.execute(query, (min_games,)).fetchall()
+
+
+class IngestStats:
+    """Counters of an ingestion run."""
+
+    def __init__(self):
+        self.games = 0
+        self.positions = 0  # Distinct positions per game, summed over the games
+        self.unknown_results = 0  # Games skipped because they have no result
+        self.illegal = 0  # Games cut short at a move the Board rules do not allow
+
+    def merge(self, other):
+        self.games += other.games
+        self.positions += other.positions
+        self.unknown_results += other.unknown_results
+        self.illegal += other.illegal
+
+
+def count_games(games):
+    """
+    Count the results of a list of games per position.
+
+    A position reached several times in one game is counted once for that game.
+    A game that breaks the Board rules counts for the positions before the bad move.
+
+    Args:
+        games (list): PDNGames.
+
+    Returns:
+        tuple: `(counts, stats)`, where counts maps position keys to
+        `[position, wins, draws, losses]` and stats is an IngestStats.
+    """
+
+    counts = {}
+    stats = IngestStats()
+    for game in games:
+        stats.games += 1
+        first_score = first_player_score(game.result)
+        if first_score is None:
+            stats.unknown_results += 1
+            continue
+        seen = set()
+        try:
+            for board, turn in replay(game):
+                key = position_key(board, turn)
+                if key in seen:
+                    continue
+                seen.add(key)
+                entry = counts.get(key)
+                if entry is None:
+                    entry = counts[key] = [to_notation(board, turn), 0, 0, 0]
+                score = first_score if turn == RED else 1 - first_score
+                # Columns 1-3 are wins, draws and losses
+                entry[1 if score == 1 else 2 if score == 0.5 else 3] += 1
+        except IllegalMove:
+            stats.illegal += 1
+        stats.positions += len(seen)
+    return counts, stats
+
+
+def _chunks(paths, size):
+    chunk = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            for game in read_games(file):
+                chunk.append(game)
+                if len(chunk) == size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def _merge(total, counts):
+    for key, values in counts.items():
+        entry = total.get(key)
+        if entry is None:
+            total[key] = values
+        else:
+            entry[1] += values[1]
+            entry[2] += values[2]
+            entry[3] += values[3]
+
+
+def ingest(paths, store, workers=None, report=print, chunk_games=CHUNK_GAMES, flush_positions=FLUSH_POSITIONS):
+    """
+    Replay every game of some PDN files and add their counts to a store.
+
+    The files are read one game at a time. Chunks of games are replayed in a pool of
+    worker processes, with at most IN_FLIGHT_PER_WORKER chunks per worker submitted
+    at once. The counts that come back are merged in memory and written to the
+    store every `flush_positions` positions and at the end.
+
+    Args:
+        paths (list): PDN files.
+        store (PositionStore): Receives the counts.
+        workers (int): Worker processes; defaults to the number of CPUs.
+        report (callable): Called with one line of progress per flush.
+        chunk_games (int): Games replayed per task.
+        flush_positions (int): Distinct positions held in memory before a flush.
+
+    Returns:
+        IngestStats: The counters of the run.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(paths, chunk_games)
+    stats = IngestStats()
+    pending_counts = {}
+    start = time.perf_counter()
+
+    def flush():
+        store.add(pending_counts)
+        pending_counts.clear()
+        seconds = time.perf_counter() - start
+        report(f"games {stats.games}  positions {stats.positions}  {stats.games / max(seconds, 1e-9):.0f} games/s")
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        while True:
+            while len(pending) < IN_FLIGHT_PER_WORKER * workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.add(executor.submit(count_games, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                counts, chunk_stats = future.result()
+                stats.merge(chunk_stats)
+                _merge(pending_counts, counts)
+            if len(pending_counts) >= flush_positions:
+                flush()
+    flush()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="add the games of PDN files to the database")
+    ingest_parser.add_argument("files", nargs="+", help="PDN files")
+    ingest_parser.add_argument("--db", default=POSITIONS_DB)
+    ingest_parser.add_argument("--workers", type=int, help="Worker processes (default: number of CPUs)")
+
+    lookup_parser = commands.add_parser("lookup", help="print the counts of a position")
+    lookup_parser.add_argument("position", help="Position in the notation of src.notation")
+    lookup_parser.add_argument("--db", default=POSITIONS_DB)
+
+    top_parser = commands.add_parser("top", help="print the most played positions")
+    top_parser.add_argument("--db", default=POSITIONS_DB)
+    top_parser.add_argument("--min-games", type=int, default=1)
+    top_parser.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    with PositionStore(args.db) as store:
+        if args.command == "ingest":
+            stats = ingest(args.files, store, args.workers)
+            print(f"{stats.games} games: {stats.unknown_results} without a result skipped, "
+                  f"{stats.illegal} cut short at an illegal move; {len(store)} positions in {args.db}")
+        elif args.command == "lookup":
+            try:
+                board, turn = from_notation(args.position)
+            except ValueError as error:
+                parser.error(str(error))
+            counts = store.lookup(board, turn)
+            if counts is None:
+                print("not found")
+                return 1
+            wins, draws, losses = counts
+            print(f"games {wins + draws + losses}  +{wins} ={draws} -{losses} for the side to move")
+        else:
+            for position, wins, draws, losses in store.most_played(args.min_games, args.limit):
+                print(f"{position}  games {wins + draws + losses:>8}  +{wins} ={draws} -{losses}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import threading
+import time
+from copy import deepcopy
+
+from src.agent import SearchControl, apply_move, expected_move
+from src.constant import BLACK_PIECES
+from src.movecache import MoveCache
+
+
+class _SearchContext:
+    """Game stand-in that shares its history and table but fixes the side to move."""
+
+    def __init__(self, game, turn):
+        self.history_scores = game.history_scores
+        self.killer_moves = game.killer_moves
+        self.staged_ordering = game.staged_ordering
+        self.quiescence = game.quiescence
+        self.late_move_reductions = game.late_move_reductions
+        self.transposition_table = game.transposition_table
+        self.tablebase = game.tablebase
+        self.batch_evaluation = game.batch_evaluation
+        self.turn = turn
+
+    def get_current_turn(self):
+        return self.turn
+
+
+class _Job:
+    """One search running on its own thread over a private copy of a position."""
+
+    def __init__(self, game, board, turn, pondering):
+        self.key = (board.hash, turn)
+        # Copies of a board share its move cache, which the GUI thread keeps using
+        board.move_cache = MoveCache(board.move_cache.max_positions)
+        self.pondering = pondering
+        self.started = time.perf_counter()
+        self.control = SearchControl()
+        if not pondering and game.time_limit is not None:
+            self.control.set_time_limit(game.time_limit)
+        self.result = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, args=(game, board, _SearchContext(game, turn)), daemon=True
+        )
+        self.thread.start()
+
+    def _run(self, game, board, context):
+        try:
+            self.result = game.find_agent_move(board, context, self.control)
+        finally:
+            self.done.set()
+
+
+class BackgroundSearch:
+    """
+    Runs the agent's searches off the GUI thread.
+
+    The GUI calls `think` and `poll` once per frame while it is the agent's turn and
+    plays the board `poll` returns. After the agent has moved, `ponder` searches the
+    position after the human reply the engine expects; if the human plays it, that
+    search simply becomes the agent's search, otherwise it is stopped.
+    """
+
+    def __init__(self, game):
+        """
+        Args:
+            game (Game): The game whose agent moves are searched.
+        """
+
+        self.game = game
+        self.job = None
+
+    def _current_key(self):
+        return (self.game.board.hash, self.game.turn)
+
+    def think(self):
+        """Make sure a search for the current position is running, reusing a matching ponder search."""
+        if self.job is not None and self.job.key == self._current_key():
+            if self.job.pondering:
+                # Time spent pondering counts towards the move's budget
+                self.job.pondering = False
+                if self.game.time_limit is not None:
+                    elapsed = time.perf_counter() - self.job.started
+                    self.job.control.set_time_limit(max(0.0, self.game.time_limit - elapsed))
+            return
+        self.stop()
+        self.job = _Job(self.game, deepcopy(self.game.board), self.game.turn, pondering=False)
+
+    def poll(self):
+        """
+        Return the agent's move once the search for the current position has finished.
+
+        Returns:
+            Board: The board after the agent's move, or None while the search is still running.
+        """
+
+        job = self.job
+        if job is None or job.pondering or not job.done.is_set() or job.key != self._current_key():
+            return None
+        self.job = None
+        return job.result
+
+    def ponder(self):
+        """Start searching the position after the expected human reply, if the table predicts one."""
+        self.stop()
+        board = self.game.board
+        human = self.game.turn
+        move = expected_move(board, human == BLACK_PIECES, _SearchContext(self.game, human))
+        if move is None or board.winner() is not None:
+            return
+        self.job = _Job(self.game, apply_move(board, move), self.game.ai_color, pondering=True)
+
+    def stop(self):
+        """Abort the running search, if any, and wait for its thread to finish."""
+        if self.job is not None:
+            self.job.control.stop()
+            self.job.thread.join()
+            self.job = None
@@ -0,0 +1,237 @@
+import numpy as np
+
+from src.bitboard import BitBoard, _SHIFTS, CENTER, ROW_0, ROW_1, ROW_6, ROW_7
+from src.board import (
+    PIECE_WEIGHT, KING_WEIGHT, CENTER_CONTROL_WEIGHT, KING_ROW_CONTROL_WEIGHT,
+    BACK_ROW_DEFENSE_WEIGHT, MOBILITY_WEIGHT, POTENTIAL_KINGING_WEIGHT,
+)
+from src.constant import RED
+from src.squares import (
+    NUM_SQUARES, SQUARE_ROW_COL, NEIGHBORS, JUMPS,
+    UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT, UP_DIRECTIONS, DOWN_DIRECTIONS, square_of,
+)
+
+# Columns of the N x 3 mask array and of the N x 4 counter array
+RED_MASK, BLACK_MASK, KING_MASK = range(3)
+RED_LEFT, BLACK_LEFT, RED_KINGS, BLACK_KINGS = range(4)
+
+_POPCOUNT_BYTES = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+
+def _popcount(masks):
+    """Count the set bits of every element of a uint32 array."""
+    masks = np.ascontiguousarray(masks, dtype=np.uint32)
+    return _POPCOUNT_BYTES[masks.view(np.uint8)].reshape(masks.shape + (4,)).sum(axis=-1)
+
+
+def _shift(masks, direction):
+    """Vectorized bitboard.shift over a uint32 array."""
+    even_shift, even_mask, odd_shift, odd_mask = _SHIFTS[direction]
+    even = masks & np.uint32(even_mask)
+    odd = masks & np.uint32(odd_mask)
+    if even_shift > 0:
+        return (even << np.uint32(even_shift)) | (odd << np.uint32(odd_shift))
+    return (even >> np.uint32(-even_shift)) | (odd >> np.uint32(-odd_shift))
+
+
+def _jump_paths(square, directions, path=()):
+    """Yield every capture path from `square` that the move rules allow geometrically, as (over, landing) steps."""
+    for direction in directions:
+        landing = JUMPS[square][direction]
+        if landing is None:
+            continue
+        # A capture continuing up the board cannot finish on row 0
+        if path and direction in UP_DIRECTIONS and SQUARE_ROW_COL[landing][0] == 0:
+            continue
+        step = path + ((NEIGHBORS[square][direction], landing),)
+        yield step
+        yield from _jump_paths(landing, directions, step)
+
+
+class _JumpPaths:
+    """
+    Every capture path on the board as arrays of masks.
+
+    A path is open when its start holds a piece capturing in the path's vertical
+    direction, every square it jumps holds an opponent and every landing is empty.
+    Paths are ordered by (start, direction, final landing), so the number of
+    distinct capture destinations is the number of those triples with an open path.
+    """
+
+    def __init__(self):
+        paths = []
+        for upward, directions in ((True, UP_DIRECTIONS), (False, DOWN_DIRECTIONS)):
+            for start in range(NUM_SQUARES):
+                for path in _jump_paths(start, directions):
+                    overs = sum(1 << over for over, _ in path)
+                    landings = sum(1 << landing for _, landing in path)
+                    paths.append((start, upward, path[-1][1], overs, landings))
+        paths.sort(key=lambda path: path[:3])
+        self.up_starts = np.array([1 << p[0] if p[1] else 0 for p in paths], dtype=np.uint32)
+        self.down_starts = np.array([0 if p[1] else 1 << p[0] for p in paths], dtype=np.uint32)
+        self.overs = np.array([p[3] for p in paths], dtype=np.uint32)
+        self.landings = np.array([p[4] for p in paths], dtype=np.uint32)
+        targets = [p[:3] for p in paths]
+        self.first_paths = np.array([i for i, target in enumerate(targets) if i == 0 or targets[i - 1] != target])
+
+    def destinations(self, up_movers, down_movers, opponents, empty):
+        """
+        Count the capture destinations of the movers of each row.
+
+        Args:
+            up_movers (ndarray): Pieces capturing up the board, one uint32 mask per row.
+            down_movers (ndarray): Pieces capturing down the board.
+            opponents (ndarray): The pieces they may capture.
+            empty (ndarray): The empty squares.
+
+        Returns:
+            ndarray: The number of distinct (piece, destination) captures of each row.
+        """
+
+        movers = (up_movers[:, None] & self.up_starts) | (down_movers[:, None] & self.down_starts)
+        open_paths = (
+            (movers != 0)
+            & ((opponents[:, None] & self.overs) == self.overs)
+            & ((empty[:, None] & self.landings) == self.landings)
+        )
+        return np.logical_or.reduceat(open_paths, self.first_paths, axis=1).sum(axis=1)
+
+
+_JUMP_PATHS = _JumpPaths()
+
+
+def encode_position(board):
+    """
+    Return the masks and counters of a Board or BitBoard.
+
+    Returns:
+        tuple: `((red, black, kings), (red_left, black_left, red_kings, black_kings))`.
+    """
+
+    counters = (board.red_left, board.black_left, board.red_kings, board.black_kings)
+    if isinstance(board, BitBoard):
+        return (board.red, board.black, board.kings), counters
+    red = black = kings = 0
+    for piece in board.get_all_pieces():
+        bit = 1 << square_of(piece.row, piece.col)
+        if piece.color == RED:
+            red |= bit
+        else:
+            black |= bit
+        if piece.king:
+            kings |= bit
+    return (red, black, kings), counters
+
+
+def encode_positions(boards):
+    """
+    Encode positions as an N x 3 uint32 array of masks and an N x 4 array of counters.
+
+    Args:
+        boards (list): Boards or BitBoards.
+
+    Returns:
+        tuple: `(masks, counters)`, with columns RED_MASK, BLACK_MASK, KING_MASK and
+        RED_LEFT, BLACK_LEFT, RED_KINGS, BLACK_KINGS.
+    """
+
+    return stack_positions([encode_position(board) for board in boards])
+
+
+def stack_positions(encoded):
+    """
+    Build the batch arrays from a list of `encode_position` results.
+
+    Returns:
+        tuple: `(masks, counters)` as returned by `encode_positions`.
+    """
+
+    masks = np.array([position for position, _ in encoded], dtype=np.uint32).reshape(-1, 3)
+    counters = np.array([counts for _, counts in encoded], dtype=np.int64).reshape(-1, 4)
+    return masks, counters
+
+
+def mobility_batch(masks):
+    """
+    Count the valid moves of every piece, as Board.mobility does, for each encoded position.
+
+    Args:
+        masks (ndarray): N x 3 uint32 masks.
+
+    Returns:
+        ndarray: The move count of each position.
+    """
+
+    red = masks[:, RED_MASK]
+    black = masks[:, BLACK_MASK]
+    kings = masks[:, KING_MASK]
+    empty = ~(red | black)
+    up_movers = black | (red & kings)
+    down_movers = red | (black & kings)
+
+    simple_moves = np.stack([
+        _shift(up_movers, UP_LEFT), _shift(up_movers, UP_RIGHT),
+        _shift(down_movers, DOWN_LEFT), _shift(down_movers, DOWN_RIGHT),
+    ], axis=1) & empty[:, None]
+    count = _popcount(simple_moves).sum(axis=1)
+
+    # Captures of both colors in one pass: red's rows first, then black's
+    captures = _JUMP_PATHS.destinations(
+        np.concatenate((red & kings, black)),
+        np.concatenate((red, black & kings)),
+        np.concatenate((black, red)),
+        np.concatenate((empty, empty)),
+    )
+    return count + captures[:len(masks)] + captures[len(masks):]
+
+
+def evaluate_positions(masks, counters):
+    """
+    Score encoded positions with the terms and weights of Board.evaluate.
+
+    Args:
+        masks (ndarray): N x 3 uint32 masks.
+        counters (ndarray): N x 4 piece and king counters.
+
+    Returns:
+        ndarray: The score of each position, equal to its Board.evaluate.
+    """
+
+    red = masks[:, RED_MASK]
+    black = masks[:, BLACK_MASK]
+    kings = masks[:, KING_MASK]
+    red_men = red & ~kings
+    black_men = black & ~kings
+
+    center, potential_kinging, king_row, back_row = _popcount(np.stack([
+        (red | black) & np.uint32(CENTER),
+        (black_men & np.uint32(ROW_6)) | (red_men & np.uint32(ROW_1)),
+        (black_men & np.uint32(ROW_7)) | (red_men & np.uint32(ROW_0)),
+        (black & np.uint32(ROW_0)) | (red & np.uint32(ROW_7)),
+    ]))
+
+    return (
+        PIECE_WEIGHT * (counters[:, BLACK_LEFT] - counters[:, RED_LEFT])
+        + KING_WEIGHT * (counters[:, BLACK_KINGS] - counters[:, RED_KINGS])
+        + MOBILITY_WEIGHT * mobility_batch(masks)
+        + CENTER_CONTROL_WEIGHT * center
+        + POTENTIAL_KINGING_WEIGHT * potential_kinging
+        + KING_ROW_CONTROL_WEIGHT * king_row
+        + BACK_ROW_DEFENSE_WEIGHT * back_row
+    )
+
+
+def evaluate_batch(boards):
+    """
+    Evaluate several boards in one vectorized call.
+
+    Args:
+        boards (list): Boards or BitBoards.
+
+    Returns:
+        list: The score of each board as an int, equal to `board.evaluate()`.
+    """
+
+    if not boards:
+        return []
+    return evaluate_positions(*encode_positions(boards)).tolist()
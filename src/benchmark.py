@@ -0,0 +1,279 @@
+"""
+Engine benchmarks.
+
+Usage:
+    python -m src.benchmark parallel --depth 6 --max-workers 8
+    python -m src.benchmark ordering --depth 7 --positions 20
+    python -m src.benchmark features --nodes 20000 --positions 12
+    python -m src.benchmark cache --sizes 1024 4096 16384 --depth 5 --plies 8
+"""
+
+import argparse
+import os
+import random
+import time
+
+from src.agent import MAX_SEARCH_DEPTH, SearchControl, SearchTimeout, get_all_moves, iterative_deepening_minimax
+from src.board import Board
+from src.constant import BLACK_PIECES, RED
+from src.game import Game
+from src.movecache import MoveCache
+from src.parallel import ParallelSearch
+from src.stats import SearchStats
+
+
+def benchmark_positions(count=6, seed=7, min_plies=6, max_plies=20):
+    """
+    Build a reproducible set of middlegame positions by playing random legal moves.
+
+    Args:
+        count (int): How many positions to return.
+        seed (int): Seed for the random move choices.
+        min_plies (int): Fewest random plies played from the start position.
+        max_plies (int): Most random plies played from the start position.
+
+    Returns:
+        list: `(board, turn)` pairs.
+    """
+
+    rng = random.Random(seed)
+    game = Game()  # Only supplies the default move ordering settings
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        turn = RED
+        for _ in range(rng.randint(min_plies, max_plies)):
+            moves = get_all_moves(board, turn, game)
+            if not moves:
+                break
+            piece, end_pos, skipped, _, _ = rng.choice(moves)
+            board.make_move(piece, end_pos, skipped)
+            turn = BLACK_PIECES if turn == RED else RED
+        if board.winner() is None and get_all_moves(board, turn, game):
+            positions.append((board, turn))
+    return positions
+
+
+def parallel_speedup(depth, max_workers, positions):
+    """
+    Time the root-parallel iterative deepening for 1 to `max_workers` workers against the serial one.
+
+    Both run every iteration up to `depth` from a fresh game, and every parallel
+    result is checked against the position the serial search moved to.
+
+    Args:
+        depth (int): Fixed search depth.
+        max_workers (int): Largest pool size to measure.
+        positions (list): `(board, turn)` pairs to search.
+
+    Returns:
+        list: `(workers, seconds, speedup)` rows, with workers == 0 standing for the serial search.
+    """
+
+    def fresh_game(turn):
+        game = Game()
+        game.turn = turn
+        return game
+
+    serial_results = []
+    start = time.perf_counter()
+    for board, turn in positions:
+        _, result = iterative_deepening_minimax(board, depth, fresh_game(turn))
+        serial_results.append(result)
+    serial_time = time.perf_counter() - start
+    rows = [(0, serial_time, 1.0)]
+
+    for workers in range(1, max_workers + 1):
+        with ParallelSearch(workers) as parallel:
+            parallel.search(*_warm_up_args())
+            start = time.perf_counter()
+            for index, ((board, turn), serial_result) in enumerate(zip(positions, serial_results)):
+                _, result = parallel.iterative_deepening(board, depth, fresh_game(turn))
+                if result.hash != serial_result.hash:
+                    raise AssertionError(f"parallel and serial search picked different moves in position {index}")
+            elapsed = time.perf_counter() - start
+        rows.append((workers, elapsed, serial_time / elapsed))
+    return rows
+
+
+def ordering_nodes(depth, positions):
+    """
+    Count the nodes a fixed-depth search visits with the history-only and the staged move ordering.
+
+    Both orderings must find the same score for every position.
+
+    Args:
+        depth (int): Fixed search depth.
+        positions (list): `(board, turn)` pairs to search.
+
+    Returns:
+        list: `(history_nodes, staged_nodes, history_seconds, staged_seconds)` rows, one per position,
+        counting the nodes of every iteration up to `depth`.
+    """
+
+    rows = []
+    for board, turn in positions:
+        row = []
+        scores = []
+        for staged in (False, True):
+            game = Game(staged_ordering=staged)
+            game.turn = turn
+            stats = SearchStats()
+            start = time.perf_counter()
+            score, _ = iterative_deepening_minimax(board, depth, game, stats=stats)
+            row.append((stats.total_nodes(), time.perf_counter() - start))
+            scores.append(score)
+        if scores[0] != scores[1]:
+            raise AssertionError(f"staged ordering scored {scores[1]}, history ordering scored {scores[0]}")
+        rows.append((row[0][0], row[1][0], row[0][1], row[1][1]))
+    return rows
+
+
+# Search switches compared by the "features" benchmark
+FEATURE_CONFIGS = [
+    ("plain", {}),
+    ("quiescence", {"quiescence": True}),
+    ("lmr", {"late_move_reductions": True}),
+    ("both", {"quiescence": True, "late_move_reductions": True}),
+]
+
+
+class _NodeBudget(SearchControl):
+    """SearchControl that stops the search after a number of nodes instead of at a deadline."""
+
+    def __init__(self, max_nodes, stats=None):
+        super().__init__(stats=stats)
+        self.max_nodes = max_nodes
+
+    def check(self):
+        self.nodes += 1
+        if self.nodes >= self.max_nodes:
+            raise SearchTimeout
+
+
+def feature_depths(node_budget, positions, configs=FEATURE_CONFIGS):
+    """
+    Measure how deep each combination of search switches gets within a node budget.
+
+    Args:
+        node_budget (int): Nodes each search may visit, over all its iterations.
+        positions (list): `(board, turn)` pairs to search.
+        configs (list): `(name, Game keyword arguments)` pairs.
+
+    Returns:
+        list: `(name, mean depth, mean score swing, seconds)` rows. The depth is the
+        deepest completed iteration; the swing is the mean absolute change of the root
+        score from one iteration to the next.
+    """
+
+    rows = []
+    for name, options in configs:
+        depths = []
+        swings = []
+        start = time.perf_counter()
+        for board, turn in positions:
+            game = Game(**options)
+            game.turn = turn
+            stats = SearchStats()
+            iterative_deepening_minimax(board, MAX_SEARCH_DEPTH, game, control=_NodeBudget(node_budget), stats=stats)
+            scores = [depth.score for depth in stats.depths if depth.completed]
+            depths.append(len(scores))
+            swings.extend(abs(b - a) for a, b in zip(scores, scores[1:]) if abs(b) != float("inf") != abs(a))
+        rows.append((
+            name, sum(depths) / len(depths), sum(swings) / max(len(swings), 1), time.perf_counter() - start
+        ))
+    return rows
+
+
+def move_cache_rates(sizes, depth, plies, positions):
+    """
+    Measure the move cache hit rate for several cache sizes over short self-play games.
+
+    From every position the engine plays `plies` moves searched to `depth`, on a
+    board whose cache is kept from move to move as in a real game.
+
+    Args:
+        sizes (list): Cache sizes, in positions.
+        depth (int): Fixed search depth of every move.
+        plies (int): Moves played from each position.
+        positions (list): `(board, turn)` pairs to start from.
+
+    Returns:
+        list: `(size, hits, misses, positions cached, seconds)` rows, one per size.
+    """
+
+    rows = []
+    for size in sizes:
+        cache = MoveCache(size)
+        start = time.perf_counter()
+        for board, turn in positions:
+            board = board.copy()
+            board.move_cache = cache
+            game = Game()
+            for _ in range(plies):
+                game.turn = turn
+                _, board = iterative_deepening_minimax(board, depth, game)
+                if board is None:
+                    break
+                turn = BLACK_PIECES if turn == RED else RED
+        rows.append((size, cache.hits, cache.misses, len(cache), time.perf_counter() - start))
+    return rows
+
+
+def _warm_up_args():
+    return Board(), 1, False, Game()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers engine benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parallel_parser = commands.add_parser("parallel", help="root-parallel search speedup curve")
+    parallel_parser.add_argument("--depth", type=int, default=6)
+    parallel_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parallel_parser.add_argument("--positions", type=int, default=6)
+
+    ordering_parser = commands.add_parser("ordering", help="nodes visited with staged against history-only move ordering")
+    ordering_parser.add_argument("--depth", type=int, default=6)
+    ordering_parser.add_argument("--positions", type=int, default=12)
+
+    features_parser = commands.add_parser("features", help="depth reached within a node budget per search switch")
+    features_parser.add_argument("--nodes", type=int, default=20000)
+    features_parser.add_argument("--positions", type=int, default=12)
+
+    cache_parser = commands.add_parser("cache", help="move cache hit rate per cache size")
+    cache_parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 16384, 65536])
+    cache_parser.add_argument("--depth", type=int, default=5)
+    cache_parser.add_argument("--plies", type=int, default=8)
+    cache_parser.add_argument("--positions", type=int, default=6)
+
+    args = parser.parse_args()
+    if args.command == "parallel":
+        positions = benchmark_positions(args.positions)
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        for workers, seconds, speedup in parallel_speedup(args.depth, args.max_workers, positions):
+            label = "serial" if workers == 0 else str(workers)
+            print(f"{label:>8} {seconds:9.2f} {speedup:8.2f}")
+    elif args.command == "ordering":
+        positions = benchmark_positions(args.positions)
+        rows = ordering_nodes(args.depth, positions)
+        print(f"{'position':>8} {'history':>10} {'staged':>10} {'reduction':>10}")
+        for index, (history_nodes, staged_nodes, _, _) in enumerate(rows):
+            print(f"{index:>8} {history_nodes:>10} {staged_nodes:>10} {1 - staged_nodes / history_nodes:>10.1%}")
+        history_nodes, staged_nodes, history_seconds, staged_seconds = (sum(column) for column in zip(*rows))
+        print(f"{'total':>8} {history_nodes:>10} {staged_nodes:>10} {1 - staged_nodes / history_nodes:>10.1%}")
+        print(f"time: history {history_seconds:.2f}s, staged {staged_seconds:.2f}s")
+    elif args.command == "features":
+        positions = benchmark_positions(args.positions)
+        print(f"{'search':>10} {'depth':>6} {'swing':>8} {'seconds':>8}")
+        for name, depth, swing, seconds in feature_depths(args.nodes, positions):
+            print(f"{name:>10} {depth:6.2f} {swing:8.1f} {seconds:8.2f}")
+    elif args.command == "cache":
+        positions = benchmark_positions(args.positions)
+        print(f"{'size':>8} {'hits':>10} {'misses':>10} {'rate':>7} {'cached':>8} {'seconds':>8}")
+        for size, hits, misses, cached, seconds in move_cache_rates(args.sizes, args.depth, args.plies, positions):
+            print(f"{size:>8} {hits:>10} {misses:>10} {hits / max(hits + misses, 1):>7.1%} {cached:>8} {seconds:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+from collections import namedtuple
+
+from src.board import (
+    Board, PIECE_WEIGHT, KING_WEIGHT, CENTER_CONTROL_WEIGHT, KING_ROW_CONTROL_WEIGHT,
+    BACK_ROW_DEFENSE_WEIGHT, MOBILITY_WEIGHT, POTENTIAL_KINGING_WEIGHT,
+)
+from src.constant import RED, BLACK_PIECES, ROWS
+from src.piece import Piece
+from src.squares import (
+    NUM_SQUARES, SQUARE_ROW_COL, square_of,
+    UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT, UP_DIRECTIONS, DOWN_DIRECTIONS,
+)
+from src.zobrist import PIECE_KEYS, king_count_key, piece_kind
+
+FULL = (1 << NUM_SQUARES) - 1
+
+EVEN_ROWS = 0x0F0F0F0F  # rows 0, 2, 4, 6: dark squares on the odd columns
+ODD_ROWS = 0xF0F0F0F0  # rows 1, 3, 5, 7: dark squares on the even columns
+NOT_RIGHT_EDGE = 0x77777777  # every square except the last one of its row
+NOT_LEFT_EDGE = 0xEEEEEEEE  # every square except the first one of its row
+
+_OPPOSITE = {UP_LEFT: DOWN_RIGHT, UP_RIGHT: DOWN_LEFT, DOWN_LEFT: UP_RIGHT, DOWN_RIGHT: UP_LEFT}
+
+# For each direction: (shift on even rows, squares that may use it,
+# shift on odd rows, squares that may use it). Positive shifts move down the board.
+_SHIFTS = {
+    UP_LEFT: (-4, EVEN_ROWS, -5, ODD_ROWS & NOT_LEFT_EDGE),
+    UP_RIGHT: (-3, EVEN_ROWS & NOT_RIGHT_EDGE, -4, ODD_ROWS),
+    DOWN_LEFT: (4, EVEN_ROWS, 3, ODD_ROWS & NOT_LEFT_EDGE),
+    DOWN_RIGHT: (5, EVEN_ROWS & NOT_RIGHT_EDGE, 4, ODD_ROWS),
+}
+
+ROW_0 = 0x0000000F
+ROW_1 = 0x000000F0
+ROW_6 = 0x0F000000
+ROW_7 = 0xF0000000
+CENTER = sum(
+    1 << square
+    for square, (row, col) in enumerate(SQUARE_ROW_COL)
+    if 2 <= row <= 5 and 2 <= col <= 5
+)
+
+
+def shift(mask, direction):
+    """
+    Move every square of a mask one step diagonally.
+
+    Args:
+        mask (int): A set of playable squares.
+        direction (int): One of UP_LEFT, UP_RIGHT, DOWN_LEFT or DOWN_RIGHT.
+
+    Returns:
+        int: The squares reached; squares that would leave the board are dropped.
+    """
+
+    even_shift, even_mask, odd_shift, odd_mask = _SHIFTS[direction]
+    even = mask & even_mask
+    odd = mask & odd_mask
+    if even_shift > 0:
+        return ((even << even_shift) | (odd << odd_shift)) & FULL
+    return (even >> -even_shift) | (odd >> -odd_shift)
+
+
+def _bit_square(bit):
+    return bit.bit_length() - 1
+
+
+BitPiece = namedtuple("BitPiece", ["row", "col", "color", "king"])
+
+
+class BitBoard:
+    """
+    Compact position made of three 32-bit masks over the playable squares.
+
+    It follows the move rules and counters of Board exactly and exposes the same
+    methods the search uses, so it can stand in for Board inside the agent.
+    """
+
+    __slots__ = ("red", "black", "kings", "red_left", "black_left", "red_kings", "black_kings", "hash")
+
+    def __init__(self, red=0, black=0, kings=0):
+        self.red = red
+        self.black = black
+        self.kings = kings
+        self.red_left = red.bit_count()
+        self.black_left = black.bit_count()
+        self.red_kings = (red & kings).bit_count()
+        self.black_kings = (black & kings).bit_count()
+        self.hash = self.compute_hash()
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Build a bitboard from a list-based Board, keeping its piece counters.
+
+        Args:
+            board (Board): The board to convert.
+
+        Returns:
+            BitBoard: The equivalent compact position.
+        """
+
+        bitboard = cls()
+        for piece in board.get_all_pieces():
+            bit = 1 << square_of(piece.row, piece.col)
+            if piece.color == RED:
+                bitboard.red |= bit
+            else:
+                bitboard.black |= bit
+            if piece.king:
+                bitboard.kings |= bit
+        bitboard.red_left = board.red_left
+        bitboard.black_left = board.black_left
+        bitboard.red_kings = board.red_kings
+        bitboard.black_kings = board.black_kings
+        bitboard.hash = bitboard.compute_hash()
+        return bitboard
+
+    def to_board(self):
+        """
+        Convert the position back to a list-based Board for the game and the GUI.
+
+        Returns:
+            Board: A new board holding the same pieces and counters.
+        """
+
+        board = Board()
+        board.board = [[None for _ in range(len(row))] for row in board.board]
+        for piece in self.get_all_pieces():
+            board.board[piece.row][piece.col] = Piece(piece.row, piece.col, piece.color, piece.king)
+        board.red_left = self.red_left
+        board.black_left = self.black_left
+        board.red_kings = self.red_kings
+        board.black_kings = self.black_kings
+        board.refresh()
+        return board
+
+    def copy(self):
+        """Return an independent copy of the position."""
+        new = BitBoard.__new__(BitBoard)
+        new.red = self.red
+        new.black = self.black
+        new.kings = self.kings
+        new.red_left = self.red_left
+        new.black_left = self.black_left
+        new.red_kings = self.red_kings
+        new.black_kings = self.black_kings
+        new.hash = self.hash
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def compute_hash(self):
+        """Compute the Zobrist key of the position from scratch; it matches Board.hash."""
+        key = king_count_key(RED, self.red_kings) ^ king_count_key(BLACK_PIECES, self.black_kings)
+        masks = (self.red & ~self.kings, self.red & self.kings, self.black & ~self.kings, self.black & self.kings)
+        for kind, mask in enumerate(masks):
+            while mask:
+                bit = mask & -mask
+                key ^= PIECE_KEYS[kind][_bit_square(bit)]
+                mask ^= bit
+        return key
+
+    def _toggle_hash(self, bit, color, king):
+        self.hash ^= PIECE_KEYS[piece_kind(color, king)][_bit_square(bit)]
+
+    def _bump_king_counter(self, color):
+        if color == BLACK_PIECES:
+            self.hash ^= king_count_key(BLACK_PIECES, self.black_kings) ^ king_count_key(
+                BLACK_PIECES, self.black_kings + 1
+            )
+            self.black_kings += 1
+        else:
+            self.hash ^= king_count_key(RED, self.red_kings) ^ king_count_key(RED, self.red_kings + 1)
+            self.red_kings += 1
+
+    def _piece_at(self, bit):
+        row, col = SQUARE_ROW_COL[_bit_square(bit)]
+        color = RED if self.red & bit else BLACK_PIECES
+        return BitPiece(row, col, color, bool(self.kings & bit))
+
+    def get_piece(self, row, col):
+        """
+        Fetch the piece located at a specific row and column on the board.
+
+        Args:
+            row (int): The row of the piece.
+            col (int): The column of the piece.
+
+        Returns:
+            BitPiece: The piece at the specified location, if present; otherwise, None.
+        """
+
+        if (row + col) % 2 == 0:
+            return None
+        bit = 1 << square_of(row, col)
+        if (self.red | self.black) & bit:
+            return self._piece_at(bit)
+        return None
+
+    def _pieces_in(self, mask):
+        pieces = []
+        while mask:
+            bit = mask & -mask
+            pieces.append(self._piece_at(bit))
+            mask ^= bit
+        return pieces
+
+    def get_all_pieces(self):
+        """Retrieve all pieces on the board in row-major order."""
+        return self._pieces_in(self.red | self.black)
+
+    def get_pieces_by_color(self, color):
+        """
+        Collect all pieces on the board of a specific color.
+
+        Args:
+            color (tuple): The color of the pieces to retrieve.
+
+        Returns:
+            list: A list of pieces matching the specified color.
+        """
+
+        return self._pieces_in(self.red if color == RED else self.black)
+
+    def place_piece(self, piece):
+        """Place a piece on the board at its designated position."""
+        bit = 1 << square_of(piece.row, piece.col)
+        if (self.red | self.black) & bit:
+            return
+        self._toggle_hash(bit, piece.color, piece.king)
+        if piece.color == RED:
+            self.red |= bit
+            self.red_left += 1
+        else:
+            self.black |= bit
+            self.black_left += 1
+        if piece.king:
+            self.kings |= bit
+            self._bump_king_counter(piece.color)
+
+    def _continue_jumps(self, bit, directions, last, opponents, empty, moves):
+        """
+        Extend a capture from `bit` with further jumps in the same vertical direction.
+
+        Like Board._generate_moves, each continuation records the
+        piece it jumps together with the previously jumped one, and a jump going
+        up the board may not finish on row 0.
+        """
+
+        for direction in directions:
+            over = shift(bit, direction)
+            if not over & opponents:
+                continue
+            landing = shift(over, direction)
+            if not landing & empty or (direction in UP_DIRECTIONS and landing & ROW_0):
+                continue
+            captured = self._piece_at(over)
+            moves[SQUARE_ROW_COL[_bit_square(landing)]] = [captured, last]
+            self._continue_jumps(landing, directions, captured, opponents, empty, moves)
+
+    def get_valid_moves(self, piece):
+        """Get all valid moves for a selected piece based on simple moves and captures."""
+        bit = 1 << square_of(piece.row, piece.col)
+        opponents = self.red if piece.color == BLACK_PIECES else self.black
+        empty = ~(self.red | self.black) & FULL
+        moves = {}
+        for directions in self._vertical_groups(piece.color, piece.king):
+            for direction in directions:
+                target = shift(bit, direction)
+                if target & empty:
+                    moves[SQUARE_ROW_COL[_bit_square(target)]] = []
+                elif target & opponents:
+                    landing = shift(target, direction)
+                    if landing & empty:
+                        captured = self._piece_at(target)
+                        moves[SQUARE_ROW_COL[_bit_square(landing)]] = [captured]
+                        self._continue_jumps(landing, directions, captured, opponents, empty, moves)
+        return moves
+
+    def _vertical_groups(self, color, king):
+        groups = []
+        if color == BLACK_PIECES or king:
+            groups.append(UP_DIRECTIONS)
+        if color == RED or king:
+            groups.append(DOWN_DIRECTIONS)
+        return groups
+
+    def _jump_targets(self, bit, directions, opponents, empty, first=True):
+        """Return the mask of every square a capture starting at `bit` can end on."""
+        targets = 0
+        for direction in directions:
+            over = shift(bit, direction)
+            if not over & opponents:
+                continue
+            landing = shift(over, direction)
+            if not landing & empty:
+                continue
+            if not first and direction in UP_DIRECTIONS and landing & ROW_0:
+                continue
+            targets |= landing | self._jump_targets(landing, directions, opponents, empty, False)
+        return targets
+
+    @staticmethod
+    def _jumpers(own, opponents, empty, up_movers, down_movers):
+        """Return the mask of the pieces of `own` with an opponent next to them and an empty square behind it."""
+        jumpers = 0
+        for direction, movers in (
+            (UP_LEFT, up_movers), (UP_RIGHT, up_movers),
+            (DOWN_LEFT, down_movers), (DOWN_RIGHT, down_movers),
+        ):
+            back = _OPPOSITE[direction]
+            jumpers |= shift(shift(empty, back) & opponents, back) & own & movers
+        return jumpers
+
+    def capturing_pieces(self, color):
+        """Return the pieces of `color` that have a capture available."""
+        own, opponents = (self.red, self.black) if color == RED else (self.black, self.red)
+        empty = ~(self.red | self.black) & FULL
+        up_movers = self.black | (self.red & self.kings)
+        down_movers = self.red | (self.black & self.kings)
+        return self._pieces_in(self._jumpers(own, opponents, empty, up_movers, down_movers))
+
+    def mobility(self):
+        """
+        Count the valid moves of every piece on the board, as Board.evaluate does.
+
+        Simple moves are counted for all pieces at once with shifted masks; only
+        pieces that have a capture available are expanded one by one.
+
+        Returns:
+            int: The total number of distinct (piece, destination) moves.
+        """
+
+        occupied = self.red | self.black
+        empty = ~occupied & FULL
+        up_movers = self.black | (self.red & self.kings)
+        down_movers = self.red | (self.black & self.kings)
+
+        count = 0
+        for direction in UP_DIRECTIONS:
+            count += (shift(up_movers, direction) & empty).bit_count()
+        for direction in DOWN_DIRECTIONS:
+            count += (shift(down_movers, direction) & empty).bit_count()
+
+        for own, color, opponents in ((self.black, BLACK_PIECES, self.red), (self.red, RED, self.black)):
+            jumpers = self._jumpers(own, opponents, empty, up_movers, down_movers)
+            while jumpers:
+                bit = jumpers & -jumpers
+                jumpers ^= bit
+                targets = 0
+                for directions in self._vertical_groups(color, bool(self.kings & bit)):
+                    targets |= self._jump_targets(bit, directions, opponents, empty)
+                count += targets.bit_count()
+        return count
+
+    def evaluate(self):
+        """
+        Evaluate the position with the same weights and terms as Board.evaluate.
+
+        Returns:
+            int: The heuristic score representing the board's state favorability.
+        """
+
+        piece_score = PIECE_WEIGHT * (self.black_left - self.red_left)
+        king_score = KING_WEIGHT * (self.black_kings - self.red_kings)
+
+        black_men = self.black & ~self.kings
+        red_men = self.red & ~self.kings
+
+        mobility_score = MOBILITY_WEIGHT * self.mobility()
+        center_control = CENTER_CONTROL_WEIGHT * ((self.red | self.black) & CENTER).bit_count()
+        potential_kinging = POTENTIAL_KINGING_WEIGHT * (
+            (black_men & ROW_6).bit_count() + (red_men & ROW_1).bit_count()
+        )
+        king_row_control = KING_ROW_CONTROL_WEIGHT * (
+            (black_men & ROW_7).bit_count() + (red_men & ROW_0).bit_count()
+        )
+        back_row_defense = BACK_ROW_DEFENSE_WEIGHT * (
+            (self.black & ROW_0).bit_count() + (self.red & ROW_7).bit_count()
+        )
+
+        return (piece_score + king_score + mobility_score +
+                center_control + king_row_control +
+                back_row_defense + potential_kinging)
+
+    def move_piece(self, piece, end_pos):
+        """Move a piece from its current position to end_pos, handling king promotion."""
+        if piece and end_pos in self.get_valid_moves(piece):
+            self._relocate(piece, end_pos)
+
+    def _relocate(self, piece, end_pos):
+        """Move a piece to an empty square and promote it on a back row."""
+        start = 1 << square_of(piece.row, piece.col)
+        end = 1 << square_of(end_pos[0], end_pos[1])
+        king = bool(self.kings & start)
+        self._toggle_hash(start, piece.color, king)
+        if piece.color == RED:
+            self.red ^= start | end
+        else:
+            self.black ^= start | end
+        if king:
+            self.kings ^= start | end
+
+        if end_pos[0] == ROWS - 1 or end_pos[0] == 0:
+            self.kings |= end
+            self._bump_king_counter(piece.color)
+        self._toggle_hash(end, piece.color, bool(self.kings & end))
+
+    def make_move(self, piece, end_pos, captured):
+        """
+        Apply an already validated move in place and return what is needed to undo it.
+
+        Args:
+            piece (BitPiece): The piece to move.
+            end_pos (tuple): The (row, col) the piece lands on.
+            captured (list): The pieces jumped by the move, as returned by get_valid_moves.
+
+        Returns:
+            tuple: An undo record to pass to unmake_move.
+        """
+
+        undo = (
+            self.red, self.black, self.kings,
+            self.red_left, self.black_left, self.red_kings, self.black_kings, self.hash,
+        )
+        self._relocate(piece, end_pos)
+        if captured:
+            self.remove(captured)
+        return undo
+
+    def unmake_move(self, undo):
+        """
+        Restore the position exactly as it was before the matching make_move call.
+
+        Args:
+            undo (tuple): The record returned by make_move.
+        """
+
+        (
+            self.red, self.black, self.kings,
+            self.red_left, self.black_left, self.red_kings, self.black_kings, self.hash,
+        ) = undo
+
+    def remove(self, pieces):
+        """Remove pieces from the board."""
+        for piece in pieces:
+            if piece != 0:
+                bit = 1 << square_of(piece.row, piece.col)
+                if (self.red | self.black) & bit:
+                    self._toggle_hash(bit, piece.color, bool(self.kings & bit))
+                self.kings &= ~bit
+                if piece.color == RED:
+                    self.red &= ~bit
+                    self.red_left -= 1
+                else:
+                    self.black &= ~bit
+                    self.black_left -= 1
+
+    def winner(self):
+        """Determine if there is a winner based on remaining pieces."""
+        if self.red_left <= 0:
+            return BLACK_PIECES
+        elif self.black_left <= 0:
+            return RED
+        return None
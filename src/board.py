@@ -1,17 +1,165 @@
-from .piece import Piece, RED, BLACK_PIECES
-from src.constant import ROWS, COLS
+from .piece import Piece
+from src.constant import BLACK_PIECES, COLS, RED, ROWS
+from src.movecache import MOBILITY_SLOT, MoveCache
+from src.squares import (
+    NUM_SQUARES, SQUARE_ROW_COL, NEIGHBORS, JUMPS, UP_DIRECTIONS, DOWN_DIRECTIONS, square_of,
+)
+from src.zobrist import SIDE_KEY, hash_position, king_count_key, piece_key, piece_kind
+
+# Constants for weight
+PIECE_WEIGHT = 100
+KING_WEIGHT = 170
+CENTER_CONTROL_WEIGHT = 30
+KING_ROW_CONTROL_WEIGHT = 30
+BACK_ROW_DEFENSE_WEIGHT = 18
+MOBILITY_WEIGHT = 5
+POTENTIAL_KINGING_WEIGHT = 72
+
+
+def positional_value(color, king, row, col):
+    """
+    Score the position-dependent evaluation terms of a single piece.
+
+    Args:
+        color (tuple): The color of the piece.
+        king (bool): Whether the piece is a king.
+        row (int): The row of the piece.
+        col (int): The column of the piece.
+
+    Returns:
+        int: The center, king-row, back-row and kinging-potential score of the piece.
+    """
+
+    value = 0
+    # Central control: extra points for pieces in the center
+    if 2 <= col <= 5 and 2 <= row <= 5:
+        value += CENTER_CONTROL_WEIGHT
+
+    # Encouragement for pieces advancing to king rows
+    if color == BLACK_PIECES and not king:
+        if row == ROWS - 2:  # One step away from becoming king
+            value += POTENTIAL_KINGING_WEIGHT
+        if row == ROWS - 1:  # On the king row
+            value += KING_ROW_CONTROL_WEIGHT
+    elif color == RED and not king:
+        if row == 1:  # One step away from becoming king
+            value += POTENTIAL_KINGING_WEIGHT
+        if row == 0:  # On the king row
+            value += KING_ROW_CONTROL_WEIGHT
+
+    # Back row defense
+    if (color == BLACK_PIECES and row == 0) or (color == RED and row == ROWS - 1):
+        value += BACK_ROW_DEFENSE_WEIGHT
+    return value
+
+
+# POSITIONAL_VALUES[piece_kind][square], with kinds ordered as in src.zobrist
+POSITIONAL_VALUES = [
+    [positional_value(color, king, *SQUARE_ROW_COL[square]) for square in range(NUM_SQUARES)]
+    for color, king in ((RED, False), (RED, True), (BLACK_PIECES, False), (BLACK_PIECES, True))
+]
+
+# Diagonal directions each piece kind moves in, grouped by vertical direction
+_VERTICAL_GROUPS = [
+    (DOWN_DIRECTIONS,),
+    (UP_DIRECTIONS, DOWN_DIRECTIONS),
+    (UP_DIRECTIONS,),
+    (UP_DIRECTIONS, DOWN_DIRECTIONS),
+]
+
+# _FIRST_JUMPS[piece_kind][square]: (jumped row, jumped col, landing row, landing col) of every
+# capture the piece could start with
+_FIRST_JUMPS = [
+    [
+        [
+            SQUARE_ROW_COL[NEIGHBORS[square][direction]] + SQUARE_ROW_COL[JUMPS[square][direction]]
+            for directions in groups
+            for direction in directions
+            if JUMPS[square][direction] is not None
+        ]
+        for square in range(NUM_SQUARES)
+    ]
+    for groups in _VERTICAL_GROUPS
+]
+
+
+def _continuations(directions):
+    """
+    List the further jumps a capture arriving on each square can make in `directions`.
+
+    A capture continuing up the board may not cross or finish on row 0. The jumps
+    are listed right to left, so that pushed on a stack the left one comes off first.
+    """
+
+    up = directions == UP_DIRECTIONS
+    return [
+        tuple(
+            SQUARE_ROW_COL[NEIGHBORS[square][direction]]
+            + (SQUARE_ROW_COL[JUMPS[square][direction]], JUMPS[square][direction])
+            for direction in reversed(directions)
+            if JUMPS[square][direction] is not None and not (up and SQUARE_ROW_COL[JUMPS[square][direction]][0] == 0)
+        )
+        for square in range(NUM_SQUARES)
+    ]
+
+
+_CONTINUATIONS = {directions: _continuations(directions) for directions in (UP_DIRECTIONS, DOWN_DIRECTIONS)}
+
+# _STEPS[piece_kind][square]: one (adjacent (row, col), landing (row, col), landing square, continuation
+# table) entry per direction the piece moves in, in the order get_valid_moves tries them; the landing
+# fields are None when a jump would leave the board
+_STEPS = [
+    [
+        tuple(
+            (
+                SQUARE_ROW_COL[NEIGHBORS[square][direction]],
+                None if JUMPS[square][direction] is None else SQUARE_ROW_COL[JUMPS[square][direction]],
+                JUMPS[square][direction],
+                _CONTINUATIONS[directions],
+            )
+            for directions in groups
+            for direction in directions
+            if NEIGHBORS[square][direction] is not None
+        )
+        for square in range(NUM_SQUARES)
+    ]
+    for groups in _VERTICAL_GROUPS
+]
 
 
 class Board:
-    def __init__(self):
+    def __init__(self, move_cache=None):
         """
         Initialize the Board class, setting up an empty board with predefined rows and columns, and initializing default game pieces.
+
+        Args:
+            move_cache (MoveCache): Cache of generated moves to use; a new one is created by default.
         """
 
         self.board = [[None for _ in range(COLS)] for _ in range(ROWS)]
         self.red_left = self.black_left = 12  # Assuming a standard game start
         self.red_kings = self.black_kings = 0
         self.initialize_pieces()
+        self.hash = 0  # Zobrist key, kept up to date by every mutation
+        self.positional_score = 0  # Running total of the positional evaluation terms
+        self.move_cache = MoveCache() if move_cache is None else move_cache
+        self.refresh()
+
+    def copy(self):
+        """Return a copy of the board with copies of its pieces; the move cache is shared and not thread-safe."""
+        new = Board.__new__(Board)
+        new.board = [[None if piece is None else piece.copy() for piece in row] for row in self.board]
+        new.red_left = self.red_left
+        new.black_left = self.black_left
+        new.red_kings = self.red_kings
+        new.black_kings = self.black_kings
+        new.hash = self.hash
+        new.positional_score = self.positional_score
+        new.move_cache = self.move_cache
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.copy()
 
     def initialize_pieces(self):
         """
@@ -33,15 +181,31 @@ class Board:
             self.board[row][col] is None
         ):  # Ensure the cell is empty before placing the piece
             self.board[row][col] = piece
+            self.hash ^= piece_key(piece)
+            self.positional_score += self._positional_value(piece)
             if piece.color == RED:
                 self.red_left += 1
                 if piece.king:
+                    self.hash ^= king_count_key(RED, self.red_kings) ^ king_count_key(RED, self.red_kings + 1)
                     self.red_kings += 1
             else:
                 self.black_left += 1
                 if piece.king:
+                    self.hash ^= king_count_key(BLACK_PIECES, self.black_kings) ^ king_count_key(
+                        BLACK_PIECES, self.black_kings + 1
+                    )
                     self.black_kings += 1
 
+    def compute_hash(self):
+        """
+        Compute the Zobrist key of the board from scratch.
+
+        Returns:
+            int: The 64-bit key of the pieces and king counters on the board.
+        """
+
+        return hash_position(self.get_all_pieces(), self.red_kings, self.black_kings)
+
     def get_board(self):
         """
         Retrieve the current state of the board as a 2D list.
@@ -79,62 +243,129 @@ class Board:
         """
         Evaluate the current board state to give a heuristic score based on various strategic elements like piece count, king count, position, mobility, etc.
 
+        The positional terms are kept as a running total by the methods that move, capture
+        and promote pieces, so only mobility is counted here.
+
         Returns:
             int: The heuristic score representing the board's state favorability.
         """
 
-        # Constants for weight
-        PIECE_WEIGHT = 100
-        KING_WEIGHT = 170
-        CENTER_CONTROL_WEIGHT = 30
-        KING_ROW_CONTROL_WEIGHT = 30
-        BACK_ROW_DEFENSE_WEIGHT = 18
-        MOBILITY_WEIGHT = 5
-        POTENTIAL_KINGING_WEIGHT = 72
-
         # Basic piece and king counts with weighted scores
         piece_score = PIECE_WEIGHT * (self.black_left - self.red_left)
         king_score = KING_WEIGHT * (self.black_kings - self.red_kings)
+        mobility_score = MOBILITY_WEIGHT * self.mobility()
+
+        return piece_score + king_score + mobility_score + self.positional_score
+
+    def mobility(self):
+        """
+        Count the valid moves of every piece using the precomputed neighbor tables.
 
-        # Advanced scoring
-        center_control = 0
-        king_row_control = 0
-        mobility_score = 0
-        potential_kinging = 0
-        back_row_defense = 0
+        Gives the same total as summing `len(get_valid_moves(piece))` over all pieces.
+        The count is kept in `move_cache` alongside the moves of the position.
 
+        Returns:
+            int: The number of distinct (piece, destination) moves on the board.
+        """
+
+        cache = self.move_cache
+        entry = cache.entry(self.hash)
+        count = entry.get(MOBILITY_SLOT)
+        if count is not None:
+            cache.hits += 1
+            return count
+        cache.misses += 1
+        count = entry[MOBILITY_SLOT] = self._count_moves()
+        return count
+
+    def _count_moves(self):
+        board = self.board
+        count = 0
         for piece in self.get_all_pieces():
-            # Mobility: count valid moves
-            valid_moves = self.get_valid_moves(piece)
-            mobility_score += MOBILITY_WEIGHT * len(valid_moves)
-
-            # Central control: extra points for pieces in the center
-            if 2 <= piece.col <= 5 and 2 <= piece.row <= 5:
-                center_control += CENTER_CONTROL_WEIGHT
-
-            # Encouragement for pieces advancing to king rows
-            if piece.color == BLACK_PIECES and not piece.king:
-                if piece.row == ROWS - 2:  # One step away from becoming king
-                    potential_kinging += POTENTIAL_KINGING_WEIGHT
-                if piece.row == ROWS - 1:  # On the king row
-                    king_row_control += KING_ROW_CONTROL_WEIGHT
-            elif piece.color == RED and not piece.king:
-                if piece.row == 1:  # One step away from becoming king
-                    potential_kinging += POTENTIAL_KINGING_WEIGHT
-                if piece.row == 0:  # On the king row
-                    king_row_control += KING_ROW_CONTROL_WEIGHT
-
-            # Back row defense
-            if (piece.color == BLACK_PIECES and piece.row == 0) or \
-            (piece.color == RED and piece.row == ROWS - 1):
-                back_row_defense += BACK_ROW_DEFENSE_WEIGHT
-
-        # Combine all scores into a final evaluation
-        total_score = (piece_score + king_score + mobility_score +
-                    center_control + king_row_control +
-                    back_row_defense + potential_kinging)
-
-        return total_score
+            square = square_of(piece.row, piece.col)
+            destinations = None
+            for directions in _VERTICAL_GROUPS[piece_kind(piece.color, piece.king)]:
+                can_jump = False
+                for direction in directions:
+                    neighbor = NEIGHBORS[square][direction]
+                    if neighbor is None:
+                        continue
+                    row, col = SQUARE_ROW_COL[neighbor]
+                    occupant = board[row][col]
+                    if occupant is None:
+                        count += 1
+                    elif occupant.color != piece.color and JUMPS[square][direction] is not None:
+                        row, col = SQUARE_ROW_COL[JUMPS[square][direction]]
+                        can_jump = can_jump or board[row][col] is None
+                if can_jump:
+                    if destinations is None:
+                        destinations = set()
+                    self._jump_destinations(square, directions, piece.color, destinations)
+            if destinations:
+                count += len(destinations)
+        return count
+
+    def capturing_pieces(self, color):
+        """Return the pieces of `color` that have a capture available."""
+        board = self.board
+        pieces = []
+        for piece in self.get_pieces_by_color(color):
+            for over_row, over_col, row, col in _FIRST_JUMPS[piece_kind(color, piece.king)][piece.row * 4 + piece.col // 2]:
+                occupant = board[over_row][over_col]
+                if occupant is not None and occupant.color != color and board[row][col] is None:
+                    pieces.append(piece)
+                    break
+        return pieces
+
+    def _jump_destinations(self, square, directions, color, destinations):
+        """Collect every square a capture from `square` can end on, following _generate_moves."""
+        board = self.board
+        stack = []
+        for direction in directions:
+            landing = JUMPS[square][direction]
+            if landing is None:
+                continue
+            row, col = SQUARE_ROW_COL[NEIGHBORS[square][direction]]
+            occupant = board[row][col]
+            if occupant is not None and occupant.color != color:
+                row, col = SQUARE_ROW_COL[landing]
+                if board[row][col] is None:
+                    stack.append(landing)
+        continuations = _CONTINUATIONS[directions]
+        while stack:
+            square = stack.pop()
+            destinations.add(square)
+            for over_row, over_col, (row, col), landing in continuations[square]:
+                occupant = board[over_row][over_col]
+                if occupant is not None and occupant.color != color and board[row][col] is None:
+                    stack.append(landing)
+
+    def compute_positional_score(self):
+        """
+        Compute the running total of the positional evaluation terms from scratch.
+
+        Returns:
+            int: The center, king-row, back-row and kinging-potential score of all pieces.
+        """
+
+        return sum(
+            POSITIONAL_VALUES[piece_kind(piece.color, piece.king)][square_of(piece.row, piece.col)]
+            for piece in self.get_all_pieces()
+        )
+
+    def _positional_value(self, piece):
+        return POSITIONAL_VALUES[piece_kind(piece.color, piece.king)][square_of(piece.row, piece.col)]
+
+    def refresh(self):
+        """
+        Recompute the incrementally maintained values (hash, positional score) from the grid.
+
+        Only needed after `board` has been edited directly; the board methods keep them up to date themselves.
+        Generated moves are cached by hash, so it must be called before moves are asked for again.
+        """
+
+        self.hash = self.compute_hash()
+        self.positional_score = self.compute_positional_score()
 
     def get_pieces_by_color(self, color):
         """
@@ -157,28 +388,94 @@ class Board:
     def move_piece(self, piece, end_pos):
         """Move a piece from its current position to end_pos, handling king promotion and capturing."""
         if piece and end_pos in self.get_valid_moves(piece):
-            # Swap positions on the board
-            start_pos = (piece.row, piece.col)
-            (
-                self.board[start_pos[0]][start_pos[1]],
-                self.board[end_pos[0]][end_pos[1]],
-            ) = self.board[end_pos[0]][end_pos[1]], self.board[start_pos[0]][start_pos[1]]
-
-            # Update the piece's position
-            piece.move(end_pos[0], end_pos[1])
+            self._relocate(piece, end_pos)
 
             # Check if the piece reaches the back rows for king promotion
             if end_pos[0] == ROWS - 1 or end_pos[0] == 0:
-                piece.define_king()
-                if piece.color == BLACK_PIECES:
-                    self.black_kings += 1
-                else:
-                    self.red_kings += 1
+                self._promote(piece)
+
+    def _relocate(self, piece, end_pos):
+        """Move a piece to an empty square, keeping the hash and positional score in step."""
+        self.hash ^= piece_key(piece)
+        self.positional_score -= self._positional_value(piece)
+        self.board[piece.row][piece.col] = None
+        self.board[end_pos[0]][end_pos[1]] = piece
+        piece.row, piece.col = end_pos
+        self.hash ^= piece_key(piece)
+        self.positional_score += self._positional_value(piece)
+
+    def _promote(self, piece):
+        """Crown a piece that reached a back row and bump its color's king counter."""
+        self.hash ^= piece_key(piece)
+        self.positional_score -= self._positional_value(piece)
+        piece.define_king()
+        self.hash ^= piece_key(piece)
+        self.positional_score += self._positional_value(piece)
+        if piece.color == BLACK_PIECES:
+            self.hash ^= king_count_key(BLACK_PIECES, self.black_kings) ^ king_count_key(
+                BLACK_PIECES, self.black_kings + 1
+            )
+            self.black_kings += 1
+        else:
+            self.hash ^= king_count_key(RED, self.red_kings) ^ king_count_key(RED, self.red_kings + 1)
+            self.red_kings += 1
+
+    def make_move(self, piece, end_pos, captured):
+        """
+        Apply an already validated move in place and return what is needed to undo it.
+
+        Args:
+            piece (Piece): The piece to move.
+            end_pos (tuple): The (row, col) the piece lands on.
+            captured (list): The pieces jumped by the move, as returned by get_valid_moves.
+
+        Returns:
+            tuple: An undo record to pass to unmake_move.
+        """
+
+        undo = (
+            piece,
+            (piece.row, piece.col),
+            captured,
+            piece.king,
+            (self.red_left, self.black_left, self.red_kings, self.black_kings, self.hash, self.positional_score),
+        )
+
+        self._relocate(piece, end_pos)
+        if end_pos[0] == ROWS - 1 or end_pos[0] == 0:
+            self._promote(piece)
+
+        if captured:
+            self.remove(captured)
+        return undo
+
+    def unmake_move(self, undo):
+        """
+        Restore the board exactly as it was before the matching make_move call.
+
+        Args:
+            undo (tuple): The record returned by make_move.
+        """
+
+        piece, start_pos, captured, was_king, state = undo
+        self.board[piece.row][piece.col] = None
+        self.board[start_pos[0]][start_pos[1]] = piece
+        piece.move(start_pos[0], start_pos[1])
+        piece.king = was_king
+        for captured_piece in captured:
+            self.board[captured_piece.row][captured_piece.col] = captured_piece
+        (
+            self.red_left, self.black_left, self.red_kings, self.black_kings, self.hash, self.positional_score
+        ) = state
 
     def remove(self, pieces):
         """Remove pieces from the board."""
         for piece in pieces:
             if piece != 0:
+                occupant = self.board[piece.row][piece.col]
+                if occupant is not None:
+                    self.hash ^= piece_key(occupant)
+                    self.positional_score -= self._positional_value(occupant)
                 self.board[piece.row][piece.col] = None
                 if piece.color == RED:
                     self.red_left -= 1
@@ -194,126 +491,66 @@ class Board:
         return None
 
     def get_valid_moves(self, piece):
-        """Get all valid moves for a selected piece based on simple moves and captures."""
-        moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == BLACK_PIECES or piece.king:
-            left_moves = moves.update(
-                self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left)
-            )
-            right_moves = moves.update(
-                self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right)
-            )
-
-        if piece.color == RED or piece.king:
-            moves.update(
-                self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left)
-            )
-            moves.update(
-                self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right)
-            )
-        return moves
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
         """
-        Explore possible moves to the left of a piece to find all valid moves including captures.
+        Get all valid moves for a selected piece based on simple moves and captures.
 
-        Args:
-            start (int): The starting row for traversal.
-            stop (int): The stopping row for traversal.
-            step (int): The step to use for row traversal, can be positive or negative.
-            color (str): The color of the moving piece.
-            left (int): The starting column for leftward moves.
-            skipped (list): Previously skipped (captured) pieces in a multi-capture move.
+        Moves are generated once per position and piece and then served from `move_cache`.
 
         Returns:
-            dict: A dictionary of valid moves from the current position.
+            dict: `{end_pos: captured pieces}`, a new dict on every call.
         """
 
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-            current = self.board[r][left]
-            if current is None:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-
-                if last:
-                    if step == -1:
-                        next_row = max(r - 3, 0)
-                    else:
-                        next_row = min(r + 3, ROWS)
-                    moves.update(
-                        self._traverse_left(r + step, next_row, step, color, left - 1, skipped=last)
-                    )
-                    moves.update(
-                        self._traverse_right(r + step, next_row, step, color, left + 1, skipped=last)
-                    )
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            left -= 1
-
+        cache = self.move_cache
+        entry = cache.entry(self.hash ^ SIDE_KEY if piece.color == BLACK_PIECES else self.hash)
+        square = piece.row * 4 + piece.col // 2
+        cached = entry.get(square)
+        if cached is not None:
+            cache.hits += 1
+            board = self.board
+            return {
+                end_pos: [board[row][col] for row, col in captured] if captured else []
+                for end_pos, captured in cached
+            }
+
+        cache.misses += 1
+        moves = self._generate_moves(piece)
+        # Only tuples of ints are stored, which the garbage collector stops tracking
+        entry[square] = tuple([
+            (end_pos, tuple([(captured.row, captured.col) for captured in pieces]) if pieces else ())
+            for end_pos, pieces in moves.items()
+        ])
         return moves
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
+    def _generate_moves(self, piece):
         """
-        Explore possible moves to the right of a piece to find all valid moves including captures.
-
-        Args:
-            start (int): The starting row for traversal.
-            stop (int): The stopping row for traversal.
-            step (int): The step to use for row traversal, can be positive or negative.
-            color (str): The color of the moving piece.
-            right (int): The starting column for rightward moves.
-            skipped (list): Previously skipped (captured) pieces in a multi-capture move.
+        Generate the moves of a piece on the grid, as returned by get_valid_moves.
 
-        Returns:
-            dict: A dictionary of valid moves from the current position.
+        Captures are expanded depth first with an explicit stack, in the same order
+        as a recursive search that tries the left branch before the right one, so a
+        square reached by several captures keeps the jumped pieces of the last one.
         """
 
+        board = self.board
+        color = piece.color
         moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-            current = self.board[r][right]
-            if current is None:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-
-                if last:
-                    if step == -1:
-                        next_row = max(r - 3, 0)
-                    else:
-                        next_row = min(r + 3, ROWS)
-                    moves.update(
-                        self._traverse_left(r + step, next_row, step, color, right - 1, skipped=last)
-                    )
-                    moves.update(
-                        self._traverse_right(r + step, next_row, step, color, right + 1, skipped=last)
-                    )
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            right += 1
+        for over, landing, landing_square, continuations in _STEPS[piece_kind(color, piece.king)][
+            piece.row * 4 + piece.col // 2
+        ]:
+            occupant = board[over[0]][over[1]]
+            if occupant is None:
+                moves[over] = []
+            elif occupant.color != color and landing is not None and board[landing[0]][landing[1]] is None:
+                stack = [(landing, landing_square, [occupant])]
+                while stack:
+                    end_pos, square, captured = stack.pop()
+                    moves[end_pos] = captured
+                    jumped = captured[0]
+                    for over_row, over_col, next_landing, next_square in continuations[square]:
+                        occupant = board[over_row][over_col]
+                        if (
+                            occupant is not None and occupant.color != color
+                            and board[next_landing[0]][next_landing[1]] is None
+                        ):
+                            # Each continuation records the piece it jumps and the one jumped before it
+                            stack.append((next_landing, next_square, [occupant, jumped]))
         return moves
@@ -0,0 +1,263 @@
+"""
+Opening book: deep offline searches of the opening tree, looked up before searching.
+
+The builder walks the tree from the start position, scores every move of each
+position with a fixed-depth search and keeps the moves within a margin of the
+best ones, weighted by how close they come to it. Only book moves are expanded,
+for both sides, up to a number of plies. The result is written as one record per
+(position, move), sorted by position key, so a lookup is a binary search over
+the memory-mapped file.
+
+Usage:
+    python -m src.book --plies 8 --depth 8 --output opening_book.bin
+"""
+
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.agent import apply_move, get_all_moves, minimax
+from src.board import Board
+from src.constant import BLACK_PIECES, RED
+from src.history import HistoryTable
+from src.transposition import decode_move, encode_move
+from src.zobrist import SIDE_KEY
+
+BOOK_FILE = "opening_book.bin"
+
+# Plies after which a game stops consulting the book
+BOOK_EXIT_PLY = 12
+
+# Moves scoring within this many points of the best move are kept, at most BOOK_MOVES per position
+BOOK_MARGIN = 20
+BOOK_MOVES = 3
+
+# File layout: header, then ENTRY_DTYPE records sorted by key
+FILE_MAGIC = b"CKOB"
+FILE_HEADER = struct.Struct("<4sI")  # magic, number of records
+ENTRY_DTYPE = np.dtype([("key", "<u8"), ("move", "<u2"), ("weight", "<u2")])
+
+
+def position_key(board, turn):
+    """Return the key of a position with `turn` to move, as used by the transposition table."""
+    return board.hash ^ SIDE_KEY if turn == BLACK_PIECES else board.hash
+
+
+class OpeningBook:
+    """Read access to a book file written by `write_book`."""
+
+    def __init__(self, path=BOOK_FILE):
+        """
+        Args:
+            path (str): The book file; it is memory-mapped, not read.
+
+        Raises:
+            ValueError: If the file is not an opening book.
+        """
+
+        with open(path, "rb") as file:
+            magic, count = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        self.path = path
+        self.entries = (
+            np.memmap(path, dtype=ENTRY_DTYPE, mode="r", offset=FILE_HEADER.size, shape=(count,))
+            if count else np.zeros(0, dtype=ENTRY_DTYPE)
+        )
+        self.keys = self.entries["key"]
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, board, turn):
+        """
+        Return the book moves of a position.
+
+        Returns:
+            list: `(move_key, weight)` pairs, highest weight first; empty if the position is not in the book.
+        """
+
+        self.probes += 1
+        key = np.uint64(position_key(board, turn))
+        start = int(np.searchsorted(self.keys, key, side="left"))
+        end = int(np.searchsorted(self.keys, key, side="right"))
+        if start == end:
+            return []
+        self.hits += 1
+        return [(decode_move(int(entry["move"])), int(entry["weight"])) for entry in self.entries[start:end]]
+
+    def choose(self, board, turn, rng=None):
+        """
+        Pick a book move for a position.
+
+        Args:
+            board (Board): The position.
+            turn (tuple): The color to move.
+            rng (random.Random): Picks among the moves in proportion to their weights;
+                without one the highest-weighted move is returned.
+
+        Returns:
+            tuple: A move as returned by `get_all_moves`, or None if the position is not in the book.
+        """
+
+        book_moves = self.lookup(board, turn)
+        if not book_moves:
+            return None
+        if rng is None:
+            move_key = book_moves[0][0]
+        else:
+            move_key = rng.choices([key for key, _ in book_moves], weights=[weight for _, weight in book_moves])[0]
+        # Matching against the legal moves also guards against key collisions
+        for move in get_all_moves(board, turn, _ORDERING_CONTEXT):
+            if move[4] == move_key:
+                return move
+        return None
+
+
+class _OrderingContext:
+    """Minimal stand-in for Game when only the legal moves are needed."""
+
+    def __init__(self):
+        self.history_scores = HistoryTable()
+
+
+_ORDERING_CONTEXT = _OrderingContext()
+
+
+def score_moves(board, turn, depth, margin=BOOK_MARGIN, max_moves=BOOK_MOVES, game=None):
+    """
+    Search every move of a position and keep the best ones within `margin` of the best.
+
+    Args:
+        board (Board): The position; moves are made and unmade on it.
+        turn (tuple): The color to move.
+        depth (int): Search depth of each move, counting the move itself.
+        margin (float): Largest score gap to the best move for a move to be kept.
+        max_moves (int): Most moves kept.
+        game (Game): Search context to reuse; its table, history and killers are cleared
+            first so the scores do not depend on earlier positions. A new one is created if None.
+
+    Returns:
+        list: `(move, weight)` pairs, best first, where `move` is as returned by
+        `get_all_moves` and weight runs from `margin + 1` for the best move down to 1.
+    """
+
+    if game is None:
+        game = _search_game()
+    else:
+        game.transposition_table.clear()
+        game.history_scores.clear()
+        game.killer_moves.clear()
+    game.turn = turn
+    is_maximizing_player = turn == BLACK_PIECES
+    scored = []
+    for move in get_all_moves(board, turn, game):
+        piece, end_pos, skipped, _, _ = move
+        undo = board.make_move(piece, end_pos, skipped)
+        try:
+            score, _ = minimax(board, depth - 1, float("-inf"), float("inf"), not is_maximizing_player, game, depth)
+        finally:
+            board.unmake_move(undo)
+        scored.append((score if is_maximizing_player else -score, move))
+    if not scored:
+        return []
+    best = max(score for score, _ in scored)
+    kept = [(move, int(margin - (best - score)) + 1) for score, move in scored if best - score <= margin]
+    kept.sort(key=lambda item: item[1], reverse=True)
+    return kept[:max_moves]
+
+
+def _search_game():
+    from src.game import Game  # src.game imports this module
+
+    return Game()
+
+
+# Search context of a joblib worker process, reused by every position it scores
+_worker_game = None
+
+
+def _analyse(board, turn, depth, margin, max_moves):
+    """Book entry and children of one position, run in a joblib worker."""
+    global _worker_game
+    if _worker_game is None:
+        _worker_game = _search_game()
+    kept = score_moves(board, turn, depth, margin, max_moves, _worker_game)
+    entries = [(position_key(board, turn), encode_move(move[4]), min(weight, 0xFFFF)) for move, weight in kept]
+    children = [apply_move(board, move) for move, _ in kept]
+    return entries, children
+
+
+def build_book(plies, depth, margin=BOOK_MARGIN, max_moves=BOOK_MOVES, n_jobs=-1, report=print):
+    """
+    Search the opening tree from the start position.
+
+    Args:
+        plies (int): Number of plies of the tree that get book moves.
+        depth (int): Search depth used to score every move.
+        margin (float): Largest score gap to the best move for a move to be kept.
+        max_moves (int): Most moves kept per position.
+        n_jobs (int): Number of joblib workers; -1 uses every CPU.
+        report (callable): Called with one line of progress per ply.
+
+    Returns:
+        list: `(key, move code, weight)` records, sorted by key and then by weight, highest first.
+    """
+
+    entries = []
+    frontier = [Board()]
+    seen = set()
+    turn = RED
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for ply in range(plies):
+            start = time.perf_counter()
+            results = parallel(delayed(_analyse)(board, turn, depth, margin, max_moves) for board in frontier)
+            turn = BLACK_PIECES if turn == RED else RED
+            frontier = []
+            for position_entries, children in results:
+                entries.extend(position_entries)
+                for child in children:
+                    key = position_key(child, turn)
+                    # Transpositions are analysed once
+                    if key not in seen and child.winner() is None:
+                        seen.add(key)
+                        frontier.append(child)
+            report(f"ply {ply + 1}: {len(results)} positions, {len(entries)} moves in total, "
+                   f"{time.perf_counter() - start:.1f}s")
+    entries.sort(key=lambda entry: (entry[0], -entry[2]))
+    return entries
+
+
+def write_book(entries, path=BOOK_FILE):
+    """Write `build_book` records to a book file, replacing it atomically."""
+    records = np.array(entries, dtype=ENTRY_DTYPE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(FILE_HEADER.pack(FILE_MAGIC, len(records)))
+        file.write(records.tobytes())
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plies", type=int, default=8, help="Plies of the opening tree to cover")
+    parser.add_argument("--depth", type=int, default=8, help="Search depth used to score the moves")
+    parser.add_argument("--margin", type=float, default=BOOK_MARGIN, help="Score gap to the best move to keep a move")
+    parser.add_argument("--moves", type=int, default=BOOK_MOVES, help="Most moves kept per position")
+    parser.add_argument("--jobs", type=int, default=-1, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--output", default=BOOK_FILE)
+    args = parser.parse_args(argv)
+
+    entries = build_book(args.plies, args.depth, args.margin, args.moves, args.jobs)
+    write_book(entries, args.output)
+    print(f"wrote {len(entries)} moves of {len({entry[0] for entry in entries})} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
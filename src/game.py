@@ -1,26 +1,87 @@
 from .board import Board
+from .bitboard import BitBoard
 from src.constant import RED, BLACK_PIECES
-from src.agent import iterative_deepening_minimax
+from src.agent import apply_move, iterative_deepening_minimax, MAX_SEARCH_DEPTH, SearchControl
+from src.book import BOOK_EXIT_PLY, OpeningBook
+from src.history import HISTORY_FILE, LEGACY_HISTORY_FILE, HistoryTable, KillerMoves
+from src.parallel import ParallelSearch
+from src.stats import SearchStats
+from src.tablebase import Tablebase
+from src.transposition import TranspositionTable
+from copy import copy, deepcopy
 import json
+import os
+import time
 
 
 class Game:
     
         
-    def __init__(self):
+    def __init__(
+        self, use_bitboard=False, transposition_bytes=16 * 1024 * 1024, time_limit=None, workers=1,
+        tablebase_dir=None, batch_evaluation=False, stats_path=None, staged_ordering=True, quiescence=False,
+        late_move_reductions=False, book_path=None, book_exit_ply=BOOK_EXIT_PLY,
+    ):
         self.board = Board()  # Initialize the board
         self.turn = RED
+        self.ply = 0  # Plies played since the start position
         self.ai_color = BLACK_PIECES
-        self.history_scores = {}
+        self.history_scores = HistoryTable()
+        self.killer_moves = KillerMoves()
+        self.staged_ordering = staged_ordering  # Hash move, captures, killers, then history; history only when off
+        self.quiescence = quiescence  # Play out captures below the horizon before evaluating
+        self.late_move_reductions = late_move_reductions  # Search late quiet moves shallower first
+        self.transposition_table = TranspositionTable(transposition_bytes)
+        self.search_depth = 4
+        self.time_limit = time_limit  # Seconds per agent move; replaces the fixed depth when set
+        self.use_bitboard = use_bitboard  # Search on a BitBoard copy of the board
+        self.workers = workers  # Fixed-depth searches use a process pool when above 1
+        self.parallel_search = None
+        self.tablebase = Tablebase(tablebase_dir) if tablebase_dir else None  # Solved endgames probed by the search
+        self.batch_evaluation = batch_evaluation  # Evaluate the leaves below depth-1 nodes in one NumPy batch
+        self.stats_path = stats_path  # JSON lines file receiving the SearchStats of every agent search
+        self.last_search_stats = None
+        self.opening_book = OpeningBook(book_path) if book_path else None
+        self.book_exit_ply = book_exit_ply  # The book is only consulted before this ply
 
     def get_board(self):
         """Return the current state of the board."""
         return self.board.get_board()
 
 
-    # def save_history_scores(self, file_path="history_scores.json"):
-    #     with open(file_path, "w") as file:
-    #         json.dump(self.history_scores, file, indent=4)
+    def load_history_scores(self, file_path=HISTORY_FILE, legacy_path=LEGACY_HISTORY_FILE):
+        """
+        Reload the history scores saved by an earlier session.
+
+        The binary table is used when it exists, otherwise the scores are imported
+        from the legacy JSON file; with neither the current scores are kept.
+
+        Returns:
+            bool: True if scores were loaded.
+        """
+
+        if os.path.exists(file_path):
+            self.history_scores = HistoryTable.load(file_path)
+        elif legacy_path and os.path.exists(legacy_path):
+            self.history_scores = HistoryTable.from_json(legacy_path)
+        else:
+            return False
+        return True
+
+    def save_history_scores(self, file_path=HISTORY_FILE):
+        self.history_scores.save(file_path)
+
+    def deep_copy(self):
+        """
+        Return a copy of the game with its own board.
+
+        The copy shares the search state (history scores, transposition table,
+        tablebase) with this game, so simulating moves on it is cheap.
+        """
+
+        game = copy(self)
+        game.board = deepcopy(self.board)
+        return game
 
     def get_current_turn(self):
         """Returns the current player's turn."""
@@ -33,6 +94,7 @@ class Game:
             self.turn = BLACK_PIECES
         elif self.turn == BLACK_PIECES:  # Use elif to ensure this is only evaluated if the first condition fails
             self.turn = RED
+        self.ply += 1
 
     def make_move(self, start_pos, end_pos):
         """
@@ -66,9 +128,59 @@ class Game:
         """
         return self.board.get_valid_moves(piece)
 
+    def find_agent_move(self, board=None, context=None, control=None):
+        """
+        Search for the agent's move without playing it.
+
+        Before `book_exit_ply` a move found in the opening book is played without
+        searching. When `stats_path` is set, the statistics of the search are kept in
+        `last_search_stats` and appended to that file as JSON lines.
+
+        Args:
+            board (Board): The position to search; defaults to the current board, which is left unchanged.
+            context: Object standing in for the game inside the search (history, table, side to move); defaults to self.
+            control (SearchControl): Optional control used to stop the search from another thread.
+
+        Returns:
+            Board: The board after the best move, or None if there is no move.
+        """
+
+        board = self.board if board is None else board
+        context = self if context is None else context
+        if self.opening_book is not None and self.ply < self.book_exit_ply:
+            book_move = self.opening_book.choose(board, context.get_current_turn())
+            if book_move is not None:
+                return apply_move(board, book_move)
+        search_board = BitBoard.from_board(board) if self.use_bitboard else board
+        if self.time_limit is None and self.workers > 1 and control is None:
+            if self.parallel_search is None:
+                self.parallel_search = ParallelSearch(
+                    self.workers, tablebase_dir=self.tablebase.directory if self.tablebase else None,
+                    batch_evaluation=self.batch_evaluation, staged_ordering=self.staged_ordering,
+                    quiescence=self.quiescence, late_move_reductions=self.late_move_reductions,
+                )
+            _, best_move = self.parallel_search.iterative_deepening(search_board, self.search_depth, context)
+        else:
+            if control is None:
+                control = SearchControl(self.time_limit)
+            depth = self.search_depth if self.time_limit is None else MAX_SEARCH_DEPTH
+            stats = SearchStats() if self.stats_path else None
+            _, best_move = iterative_deepening_minimax(search_board, depth, context, control=control, stats=stats)
+            if stats is not None:
+                self.last_search_stats = stats
+                stats.write_jsonl(self.stats_path, searched_at=time.time())
+        if best_move is not None and self.use_bitboard:
+            best_move = best_move.to_board()
+        return best_move
+
+    def play_agent_move(self, board):
+        """Replace the board with the one returned by find_agent_move and pass the turn."""
+        self.board = board
+        self.change_turn()
+
     def agent_move(self):
         if self.turn == BLACK_PIECES:
-            _, best_move = iterative_deepening_minimax(self.board, 4, self)
+            best_move = self.find_agent_move()
             if best_move:
                 self.board = best_move
                 self.change_turn()
@@ -1,6 +1,14 @@
+import os
 import pygame
 from src.constant import BLACK, BLUE, GREEN, ROWS, COLS, square_size, WHITE
 
+CROWN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "crown.png")
+
+
+def load_crown():
+    """Load the crown image drawn on kings, scaled to fit inside a piece."""
+    return pygame.transform.scale(pygame.image.load(CROWN_PATH), (45, 25))
+
 
 class GUI:
     def __init__(self, window, game):
@@ -18,6 +26,7 @@ class GUI:
             None  # Store the position (row, col) of the selected piece
         )
         self.valid_moves = {}  # Dictionary of valid moves from the selected position
+        self.crown = load_crown()
 
     def draw_board(self):
         """
@@ -39,15 +48,25 @@ class GUI:
 
     def draw_pieces(self):
         """
-        Draw all the pieces on the board, delegating the piece drawing to each piece's draw method.
+        Draw all the pieces on the board, with a crown on top of each king.
+
+        Pieces only know their square; the pixel position of its center is computed here.
         """
 
         board = self.game.get_board()  # Retrieve the board from the Game instance
+        radius = square_size // 2 - 10
         for row in range(ROWS):
             for col in range(COLS):
                 piece = board[row][col]
                 if piece:
-                    piece.draw(self.window)
+                    x = square_size * col + square_size // 2
+                    y = square_size * row + square_size // 2
+                    pygame.draw.circle(self.window, piece.color, (x, y), radius)
+                    if piece.king:
+                        self.window.blit(
+                            self.crown,
+                            (x - self.crown.get_width() // 2, y - self.crown.get_height() // 2),
+                        )
 
     def handle_click(self, row, col):
         """
@@ -0,0 +1,136 @@
+import ast
+import json
+import os
+import struct
+from array import array
+
+import numpy as np
+
+from src.squares import NUM_SQUARES, SQUARE_ROW_COL
+from src.transposition import encode_move
+
+# One score per (from square, to square) pair, indexed like encode_move
+TABLE_SIZE = NUM_SQUARES * NUM_SQUARES
+
+HISTORY_FILE = "history_scores.bin"
+LEGACY_HISTORY_FILE = "history_scores.json"
+
+# File layout: magic, entry count, then TABLE_SIZE little-endian float64 scores
+FILE_MAGIC = b"CKHT"
+FILE_HEADER = struct.Struct("<4sI")
+
+
+class HistoryTable:
+    """
+    History heuristic scores of every move, in a flat array indexed by from/to square.
+
+    `scores` is a stdlib array, so the move ordering reads a score with a single
+    integer index; `view` is a NumPy array over the same memory and is used for the
+    operations on the whole table.
+    """
+
+    def __init__(self):
+        self.scores = array("d", bytes(8 * TABLE_SIZE))
+        self.view = np.frombuffer(self.scores, dtype=np.float64)
+
+    def __getstate__(self):
+        return self.scores.tobytes()
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.scores[:] = array("d", state)
+
+    def get(self, move_key):
+        """Return the score of a (from_row, from_col, to_row, to_col) move key."""
+        return self.scores[encode_move(move_key)]
+
+    def add(self, move_key, amount):
+        """Raise the score of a move key by `amount`."""
+        self.scores[encode_move(move_key)] += amount
+
+    def clear(self):
+        self.view[:] = 0
+
+    def decay(self, factor=0.99):
+        """Scale every score by `factor`."""
+        self.view *= factor
+
+    def normalize(self):
+        """Divide every score by the largest one, keeping their relative order."""
+        max_score = self.view.max()
+        if max_score > 0:
+            self.view /= max_score
+
+    def items(self):
+        """Return the `(move_key, score)` pairs of the moves with a nonzero score."""
+        return [
+            (SQUARE_ROW_COL[index // NUM_SQUARES] + SQUARE_ROW_COL[index % NUM_SQUARES], self.scores[index])
+            for index in np.flatnonzero(self.view).tolist()
+        ]
+
+    def save(self, path=HISTORY_FILE):
+        """Write the table to a binary file, replacing it atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, TABLE_SIZE))
+            file.write(self.view.astype("<f8").tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=HISTORY_FILE):
+        """
+        Read a table written by `save`, through a memory map of the file.
+
+        Raises:
+            ValueError: If the file is not a history table.
+        """
+
+        with open(path, "rb") as file:
+            magic, size = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != FILE_MAGIC or size != TABLE_SIZE:
+            raise ValueError(f"{path} is not a history table")
+        mapped = np.memmap(path, dtype="<f8", mode="r", offset=FILE_HEADER.size, shape=(TABLE_SIZE,))
+        table = cls()
+        table.view[:] = mapped
+        del mapped
+        return table
+
+    @classmethod
+    def from_json(cls, path=LEGACY_HISTORY_FILE):
+        """
+        Import the JSON format of history_scores.json, whose keys are move keys written as strings.
+
+        Returns:
+            HistoryTable: The table holding the imported scores.
+        """
+
+        table = cls()
+        with open(path) as file:
+            for key, score in json.load(file).items():
+                table.add(ast.literal_eval(key), score)
+        return table
+
+
+class KillerMoves:
+    """
+    The last two quiet moves that caused a cutoff, per remaining search depth.
+
+    Within one iteration the remaining depth identifies the ply, so a killer is
+    tried again at the sibling positions of the node where it refuted a move.
+    """
+
+    def __init__(self):
+        self.killers = {}
+
+    def get(self, depth):
+        """Return the move keys stored for `depth`, most recent first."""
+        return self.killers.get(depth, ())
+
+    def add(self, depth, move_key):
+        """Store a move key that caused a cutoff at `depth`, dropping the older of the two killers."""
+        killers = self.killers.get(depth, ())
+        if not killers or killers[0] != move_key:
+            self.killers[depth] = (move_key,) + killers[:1]
+
+    def clear(self):
+        self.killers.clear()
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+# Positions kept before the least recently used one is dropped
+MOVE_CACHE_POSITIONS = 16384
+
+# Slot of an entry holding the mobility count of the position instead of the moves of a square
+MOBILITY_SLOT = -1
+
+
+class MoveCache:
+    """
+    Bounded LRU cache of the legal moves generated on a position.
+
+    Entries are keyed by the Zobrist key of the position combined with the color
+    to move, so every mutation that keeps the key up to date also moves the board
+    to a different entry and nothing has to be invalidated. Each entry maps the
+    square of every piece generated so far to its moves, with the jumped pieces
+    stored as squares: the same cache can then be shared by copies of a board,
+    whose Piece objects differ. The entry of the red key also holds the mobility
+    count of the position under MOBILITY_SLOT.
+
+    A cache is not thread-safe: a board searched on another thread needs its own.
+    """
+
+    def __init__(self, max_positions=MOVE_CACHE_POSITIONS):
+        """
+        Args:
+            max_positions (int): Number of positions kept before the least recently used is evicted.
+        """
+
+        self.max_positions = max_positions
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Boards sent to worker processes start with an empty cache
+        return self.max_positions
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def entry(self, key):
+        """
+        Return the entry of a position, marking it as the most recently used.
+
+        A missing entry is created empty, evicting the least recently used position if
+        the cache is full. The caller fills in the squares it generates and counts
+        each lookup in `hits` or `misses`.
+
+        Args:
+            key (int): The position key, as built by `Board.get_valid_moves`.
+
+        Returns:
+            dict: `{square: ((end_pos, captured squares), ...)}`, plus the mobility count under MOBILITY_SLOT.
+        """
+
+        entries = self.entries
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = {}
+            if len(entries) > self.max_positions:
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(key)
+        return entry
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,85 @@
+from src.board import Board
+from src.bitboard import BitBoard
+from src.constant import RED, BLACK_PIECES, ROWS, COLS
+from src.piece import Piece
+from src.squares import NUM_SQUARES, SQUARE_ROW_COL, square_of
+
+# A position is written as the side to move, a colon and one character per playable
+# square (0-31, row by row from the top-left), e.g. the start position is
+# "r:rrrrrrrrrrrr........bbbbbbbbbbbb".
+EMPTY_CHAR = "."
+PIECE_CHARS = {(RED, False): "r", (RED, True): "R", (BLACK_PIECES, False): "b", (BLACK_PIECES, True): "B"}
+CHAR_PIECES = {char: piece for piece, char in PIECE_CHARS.items()}
+TURN_CHARS = {RED: "r", BLACK_PIECES: "b"}
+CHAR_TURNS = {char: turn for turn, char in TURN_CHARS.items()}
+
+START_POSITION = "r:" + "r" * 12 + EMPTY_CHAR * 8 + "b" * 12
+
+
+def to_notation(board, turn):
+    """
+    Write a position as a string.
+
+    Args:
+        board (Board): A Board or BitBoard.
+        turn (tuple): The color to move.
+
+    Returns:
+        str: The position in the format described above.
+    """
+
+    squares = [EMPTY_CHAR] * NUM_SQUARES
+    for piece in board.get_all_pieces():
+        squares[square_of(piece.row, piece.col)] = PIECE_CHARS[(piece.color, piece.king)]
+    return TURN_CHARS[turn] + ":" + "".join(squares)
+
+
+def from_notation(text, board_class=Board):
+    """
+    Read a position written by `to_notation`.
+
+    The king counters are set to the number of kings on the board.
+
+    Args:
+        text (str): The position string.
+        board_class (type): Board or BitBoard.
+
+    Returns:
+        tuple: The board and the color to move.
+
+    Raises:
+        ValueError: If the string is not a valid position.
+    """
+
+    turn_char, _, squares = text.strip().partition(":")
+    if turn_char not in CHAR_TURNS or len(squares) != NUM_SQUARES:
+        raise ValueError(f"Not a position: {text!r}")
+
+    if board_class is BitBoard:
+        red = black = kings = 0
+        for square, char in enumerate(squares):
+            if char == EMPTY_CHAR:
+                continue
+            if char not in CHAR_PIECES:
+                raise ValueError(f"Unknown piece {char!r} in {text!r}")
+            color, king = CHAR_PIECES[char]
+            if color == RED:
+                red |= 1 << square
+            else:
+                black |= 1 << square
+            if king:
+                kings |= 1 << square
+        return BitBoard(red, black, kings), CHAR_TURNS[turn_char]
+
+    board = board_class()
+    board.board = [[None for _ in range(COLS)] for _ in range(ROWS)]
+    board.red_left = board.black_left = board.red_kings = board.black_kings = 0
+    board.refresh()
+    for square, char in enumerate(squares):
+        if char == EMPTY_CHAR:
+            continue
+        if char not in CHAR_PIECES:
+            raise ValueError(f"Unknown piece {char!r} in {text!r}")
+        color, king = CHAR_PIECES[char]
+        board.place_piece(Piece(*SQUARE_ROW_COL[square], color, king))
+    return board, CHAR_TURNS[turn_char]
@@ -0,0 +1,203 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.agent import apply_move, minimax, move_first, root_moves
+from src.constant import BLACK_PIECES
+from src.history import HistoryTable, KillerMoves
+from src.tablebase import Tablebase
+from src.transposition import TranspositionTable
+from src.zobrist import SIDE_KEY
+
+# Per-process state, set up once by _init_worker
+_shared_bound = None
+_worker_context = None
+
+
+class _WorkerContext:
+    """The parts of Game that minimax uses, kept alive between tasks of one worker."""
+
+    def __init__(
+        self, transposition_bytes, tablebase_dir, batch_evaluation, staged_ordering, quiescence, late_move_reductions
+    ):
+        self.history_scores = HistoryTable()
+        self.killer_moves = KillerMoves()
+        self.staged_ordering = staged_ordering
+        self.quiescence = quiescence
+        self.late_move_reductions = late_move_reductions
+        self.transposition_table = TranspositionTable(transposition_bytes)
+        self.tablebase = Tablebase(tablebase_dir) if tablebase_dir else None
+        self.batch_evaluation = batch_evaluation
+
+
+def _init_worker(shared_bound, transposition_bytes, *options):
+    global _shared_bound, _worker_context
+    _shared_bound = shared_bound
+    _worker_context = _WorkerContext(transposition_bytes, *options)
+
+
+def _search_child(index, child, depth, is_maximizing_player, max_depth, history_scores):
+    """
+    Search one root move in a worker, using the best root score found so far as bound.
+
+    Returns:
+        tuple: `(index, score, bound)` where `bound` is the alpha (or beta) the child was searched with.
+    """
+
+    _worker_context.history_scores = history_scores
+    bound = _shared_bound.value
+    if is_maximizing_player:
+        score, _ = minimax(child, depth - 1, bound, float("inf"), False, _worker_context, max_depth)
+        with _shared_bound.get_lock():
+            if score > _shared_bound.value:
+                _shared_bound.value = score
+    else:
+        score, _ = minimax(child, depth - 1, float("-inf"), bound, True, _worker_context, max_depth)
+        with _shared_bound.get_lock():
+            if score < _shared_bound.value:
+                _shared_bound.value = score
+    return index, score, bound
+
+
+class ParallelSearch:
+    """
+    Root-parallel alpha-beta over a pool of worker processes.
+
+    The root moves are searched concurrently; every worker starts from the best
+    root score reported so far, and moves whose bounded result could still tie the
+    best score are re-searched with a full window. Given the same root move order,
+    the chosen move is therefore the same as the one `search_root` picks serially
+    at the same depth.
+    """
+
+    def __init__(
+        self, workers=None, transposition_bytes=16 * 1024 * 1024, tablebase_dir=None, batch_evaluation=False,
+        staged_ordering=True, quiescence=False, late_move_reductions=False,
+    ):
+        """
+        Args:
+            workers (int): Number of worker processes; defaults to the number of CPUs.
+            transposition_bytes (int): Transposition table size of each worker.
+            tablebase_dir (str): Directory of endgame table files each worker maps, or None.
+            batch_evaluation (bool): Whether the workers evaluate depth-1 leaves in batches.
+            staged_ordering (bool): Whether the workers use the staged move ordering of `order_moves`.
+            quiescence (bool): Whether the workers extend the horizon with a capture search.
+            late_move_reductions (bool): Whether the workers reduce late quiet moves.
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.shared_bound = multiprocessing.Value("d", 0.0)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(
+                self.shared_bound, transposition_bytes, tablebase_dir, batch_evaluation, staged_ordering,
+                quiescence, late_move_reductions,
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut the worker processes down."""
+        self.executor.shutdown()
+
+    def search(self, board, depth, is_maximizing_player, game, max_depth=None, first_move=None, moves=None):
+        """
+        Search the root position to a fixed depth across the pool.
+
+        Args:
+            board (Board): The position to search; it is not modified.
+            depth (int): The depth to search to.
+            is_maximizing_player (bool): True if the side to move is maximizing.
+            game (Game): Supplies the history scores and transposition table used for root ordering and re-searches.
+            max_depth (int): The maximum depth used to weight history updates; defaults to `depth`.
+            first_move (tuple): Move key to order first; defaults to the transposition table move.
+            moves (list): Root moves in search order, as returned by `root_moves`; generated if None.
+
+        Returns:
+            tuple: The best score and the best move as returned by `get_all_moves`, or None if there is no move.
+        """
+
+        max_depth = max_depth or depth
+        if board.winner() is not None:
+            return board.evaluate(), None
+
+        if first_move is None:
+            entry = game.transposition_table.probe(board.hash ^ SIDE_KEY if is_maximizing_player else board.hash)
+            if entry is not None:
+                first_move = entry[3]
+        if moves is None:
+            moves = root_moves(board, is_maximizing_player, game)
+        moves = move_first(moves, first_move)
+        if not moves:
+            return (float("-inf") if is_maximizing_player else float("inf")), None
+
+        unbounded = float("-inf") if is_maximizing_player else float("inf")
+        self.shared_bound.value = unbounded
+
+        futures = [
+            self.executor.submit(
+                _search_child, index, apply_move(board, move), depth, is_maximizing_player,
+                max_depth, game.history_scores,
+            )
+            for index, move in enumerate(moves)
+        ]
+        results = [None] * len(moves)
+        for future in as_completed(futures):
+            index, score, bound = future.result()
+            results[index] = (score, bound)
+
+        def exact(score, bound):
+            if bound == unbounded:
+                return True
+            return score > bound if is_maximizing_player else score < bound
+
+        exact_scores = [score for score, bound in results if exact(score, bound)]
+        best = (max if is_maximizing_player else min)(exact_scores)
+        for index, (score, bound) in enumerate(results):
+            # A bounded result equal to the best score may hide a tie that the serial search would pick first
+            if not exact(score, bound) and score == best:
+                child = apply_move(board, moves[index])
+                score, _ = minimax(
+                    child, depth - 1, float("-inf"), float("inf"), not is_maximizing_player, game, max_depth
+                )
+                results[index] = (score, unbounded)
+            if results[index][0] == best and exact(*results[index]):
+                return best, moves[index]
+        return best, None
+
+    def iterative_deepening(self, board, max_depth, game):
+        """
+        Run `search` for depths 1 to `max_depth` and play the deepest result.
+
+        The root moves are ordered once, as `iterative_deepening_minimax` orders them,
+        so both pick the same move from the same game state.
+
+        Args:
+            board (Board): The position to search; it is not modified.
+            max_depth (int): The maximum depth to search to.
+            game (Game): The current game context containing state and history.
+
+        Returns:
+            tuple: The best value and the board after the best move, like `iterative_deepening_minimax`.
+        """
+
+        is_maximizing_player = game.get_current_turn() == BLACK_PIECES
+        best_val, best_move = None, None
+        game.transposition_table.new_search()
+        game.killer_moves.clear()
+        moves = root_moves(board, is_maximizing_player, game)
+        for depth in range(1, max_depth + 1):
+            best_val, best_move = self.search(
+                board, depth, is_maximizing_player, game, max_depth, best_move[4] if best_move else None, moves
+            )
+            if best_move is None:
+                break
+        if best_move is None:
+            return best_val, None
+        return best_val, apply_move(board, best_move)
@@ -0,0 +1,191 @@
+"""
+Reading games in Portable Draughts Notation (PDN).
+
+PDN numbers the playable squares 1-32 row by row from the side that moves first,
+so PDN square n is square n - 1 of src.squares. PDN calls the side on squares
+1-12 Black and the other side White; on this board the side on squares 0-11 is
+red, so PDN Black is RED and PDN White is BLACK_PIECES throughout this module.
+"""
+
+import re
+from collections import namedtuple
+
+from src.constant import BLACK_PIECES, RED, ROWS
+from src.notation import EMPTY_CHAR, PIECE_CHARS, START_POSITION, TURN_CHARS, from_notation
+from src.squares import NUM_SQUARES, SQUARE_ROW_COL
+
+# `moves` holds one tuple of PDN square numbers per move, e.g. (11, 15) or (15, 24, 31)
+PDNGame = namedtuple("PDNGame", ["tags", "moves", "result"])
+
+# Results, from the point of view of the side that moves first
+FIRST_WINS = ("1-0", "2-0")
+SECOND_WINS = ("0-1", "0-2")
+DRAWS = ("1/2-1/2", "1-1")
+UNKNOWN_RESULT = "*"
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<pair>\[\s*(?P<tag>\w+)\s+"(?P<value>(?:[^"\\]|\\.)*)"\s*\])
+        | (?P<result>1-0|0-1|2-0|0-2|1/2-1/2|1-1|0-0|\*)(?![-x:/\d])
+        | (?P<move>\d+(?:[-x:]\d+)+)
+        | (?P<open>[{(;])
+        | (?P<close>\))
+        | \d+\.(?:\.\.)?
+        | [!?]+ | \$\d+
+        | [^\s{}();\[\]]+ | \S
+    )""",
+    re.VERBOSE,
+)
+_MOVE_SEPARATOR = re.compile(r"[-x:]")
+
+
+def read_games(lines):
+    """
+    Parse PDN games one at a time from an iterable of lines, e.g. an open file.
+
+    Comments, variations, move numbers and move strength marks are skipped. A
+    game ends at its result; a game without one ends at the next tag section or
+    at the end of the input and takes the result of its Result tag.
+
+    Args:
+        lines (iterable): Lines of PDN text.
+
+    Yields:
+        PDNGame: Each game, with its tags, its moves and its result string.
+    """
+
+    tags = {}
+    moves = []
+    in_comment = False
+    variation_depth = 0
+    for line in lines:
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if in_comment:
+                close = line.find("}", pos)
+                if close < 0:
+                    break
+                in_comment = False
+                pos = close + 1
+                continue
+            match = _TOKEN.match(line, pos)
+            if match is None:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "open":
+                bracket = match.group("open")
+                if bracket == "{":
+                    in_comment = True
+                elif bracket == "(":
+                    variation_depth += 1
+                else:
+                    break  # A ";" comments out the rest of the line
+            elif kind == "close":
+                variation_depth = max(variation_depth - 1, 0)
+            elif variation_depth:
+                continue
+            elif kind == "move":
+                moves.append(tuple(int(square) for square in _MOVE_SEPARATOR.split(match.group("move"))))
+            elif kind == "pair":
+                if moves:
+                    yield PDNGame(tags, moves, tags.get("Result", UNKNOWN_RESULT))
+                    tags, moves = {}, []
+                tags[match.group("tag")] = match.group("value")
+            elif kind == "result":
+                yield PDNGame(tags, moves, match.group("result"))
+                tags, moves = {}, []
+    if moves or tags:
+        yield PDNGame(tags, moves, tags.get("Result", UNKNOWN_RESULT))
+
+
+def fen_to_notation(fen):
+    """
+    Convert a PDN FEN tag value such as "B:W18,24,K10:B12,16,K22" to the notation of src.notation.
+
+    Square lists may contain ranges such as "1-12" and kings are prefixed with K.
+
+    Raises:
+        ValueError: If the value is not a FEN position.
+    """
+
+    fields = fen.strip().rstrip(".").split(":")
+    if len(fields) != 3 or fields[0].upper() not in ("B", "W"):
+        raise ValueError(f"Not a FEN position: {fen!r}")
+    squares = [EMPTY_CHAR] * NUM_SQUARES
+    for field in fields[1:]:
+        if not field or field[0].upper() not in ("B", "W"):
+            raise ValueError(f"Not a FEN position: {fen!r}")
+        color = RED if field[0].upper() == "B" else BLACK_PIECES
+        for item in filter(None, field[1:].split(",")):
+            king = item[0].upper() == "K"
+            first, _, last = item.lstrip("Kk").partition("-")
+            for number in range(int(first), int(last or first) + 1):
+                if not 1 <= number <= NUM_SQUARES:
+                    raise ValueError(f"Square {number} out of range in {fen!r}")
+                squares[number - 1] = PIECE_CHARS[(color, king)]
+    turn = RED if fields[0].upper() == "B" else BLACK_PIECES
+    return TURN_CHARS[turn] + ":" + "".join(squares)
+
+
+class IllegalMove(ValueError):
+    """A game contains a move that is not legal on the board it was replayed on."""
+
+
+def replay(game):
+    """
+    Play a game through the Board rules, yielding every position it reaches.
+
+    The king counters of the board are kept equal to the number of kings on it,
+    as `from_notation` sets them, so a position has the same key however it was
+    reached.
+
+    Args:
+        game (PDNGame): The game; its FEN tag, if any, gives the start position.
+
+    Yields:
+        tuple: `(board, turn)` for the start position and after every move. The same
+        board is updated in place, so it is only valid until the next position.
+
+    Raises:
+        IllegalMove: At the first move that the board does not allow; the positions
+            before it have been yielded.
+    """
+
+    fen = game.tags.get("FEN")
+    board, turn = from_notation(fen_to_notation(fen) if fen else START_POSITION)
+    yield board, turn
+    for ply, squares in enumerate(game.moves):
+        start, end = squares[0] - 1, squares[-1] - 1
+        if not (0 <= start < NUM_SQUARES and 0 <= end < NUM_SQUARES):
+            raise IllegalMove(f"ply {ply + 1}: no square {squares}")
+        piece = board.get_piece(*SQUARE_ROW_COL[start])
+        if piece is None or piece.color != turn:
+            raise IllegalMove(f"ply {ply + 1}: no piece to move on {squares[0]}")
+        end_pos = SQUARE_ROW_COL[end]
+        captured = board.get_valid_moves(piece).get(end_pos)
+        if captured is None:
+            raise IllegalMove(f"ply {ply + 1}: {squares[0]} cannot move to {squares[-1]}")
+        was_king = piece.king
+        board.make_move(piece, end_pos, captured)
+        # Captured kings are not taken off the counters, and a king reaching a back row is counted again
+        if (was_king and end_pos[0] in (0, ROWS - 1)) or any(captured_piece.king for captured_piece in captured):
+            kings = [king.color for king in board.get_all_pieces() if king.king]
+            board.red_kings = kings.count(RED)
+            board.black_kings = kings.count(BLACK_PIECES)
+            board.refresh()
+        turn = BLACK_PIECES if turn == RED else RED
+        yield board, turn
+
+
+def first_player_score(result):
+    """Return 1, 0.5 or 0 for a result string from the side that moves first, or None if it is unknown."""
+    if result in FIRST_WINS:
+        return 1
+    if result in SECOND_WINS:
+        return 0
+    if result in DRAWS:
+        return 0.5
+    return None
+
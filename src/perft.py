@@ -0,0 +1,147 @@
+"""
+Move generation node counts (perft).
+
+Counts the leaf nodes of the full move tree to a fixed depth and checks them
+against recorded reference counts, so any change to move generation or
+make/unmake that alters the set of legal moves is caught.
+
+Usage:
+    python -m src.perft                       # check every stored position on every backend
+    python -m src.perft --backend bitboard --depth 7
+    python -m src.perft --position "r:rrrrrrrrrrrr........bbbbbbbbbbbb" --depth 4 --divide
+"""
+
+import argparse
+import sys
+import time
+
+from src.bitboard import BitBoard
+from src.board import Board
+from src.constant import BLACK_PIECES, RED
+from src.notation import START_POSITION, from_notation
+
+BACKENDS = {"board": Board, "bitboard": BitBoard}
+
+# (name, position, {depth: leaf count}), recorded with the original list-based Board
+PERFT_POSITIONS = [
+    ("start", START_POSITION, {1: 7, 2: 49, 3: 379, 4: 2872, 5: 23582, 6: 190647, 7: 1607272}),
+    ("captures", "r:...rrrr.rbbr.r..bb.b.rrbb.b....b", {1: 10, 2: 94, 3: 941, 4: 8421, 5: 82684}),
+    ("kings", "r:.rrrr.r.rb..b..b..Rrbb.b......R.", {1: 13, 2: 101, 3: 1287, 4: 8567, 5: 105271}),
+    ("endgame", "b:.BBr...bb.b..r..brrb.......bR.R.", {1: 10, 2: 80, 3: 701, 4: 6107, 5: 49788}),
+]
+
+
+def _other(color):
+    return BLACK_PIECES if color == RED else RED
+
+
+def perft(board, color, depth):
+    """
+    Count the leaf nodes of the move tree below a position.
+
+    Args:
+        board (Board): A Board or BitBoard; every move is made and unmade on it.
+        color (tuple): The color to move.
+        depth (int): Number of plies to expand.
+
+    Returns:
+        int: The number of positions reached after exactly `depth` plies.
+    """
+
+    if depth == 0:
+        return 1
+    nodes = 0
+    for piece in board.get_pieces_by_color(color):
+        for end_pos, captured in board.get_valid_moves(piece).items():
+            if depth == 1:
+                nodes += 1
+                continue
+            undo = board.make_move(piece, end_pos, captured)
+            nodes += perft(board, _other(color), depth - 1)
+            board.unmake_move(undo)
+    return nodes
+
+
+def divide(board, color, depth):
+    """
+    Split the perft count of a position by root move.
+
+    Returns:
+        dict: `"(row, col)-(row, col)"` move labels mapped to their leaf counts.
+    """
+
+    counts = {}
+    for piece in board.get_pieces_by_color(color):
+        start = (piece.row, piece.col)
+        for end_pos, captured in board.get_valid_moves(piece).items():
+            undo = board.make_move(piece, end_pos, captured)
+            counts[f"{start}-{end_pos}"] = perft(board, _other(color), depth - 1)
+            board.unmake_move(undo)
+    return counts
+
+
+def run_suite(backends, max_depth=None, positions=PERFT_POSITIONS, report=print):
+    """
+    Run perft on the stored positions and compare against the reference counts.
+
+    Args:
+        backends (list): Names from BACKENDS.
+        max_depth (int): Deepest reference depth to check; all of them by default.
+        positions (list): `(name, position, counts)` entries.
+        report (callable): Called with one line of text per result.
+
+    Returns:
+        bool: True if every count matched.
+    """
+
+    ok = True
+    for backend in backends:
+        for name, position, counts in positions:
+            for depth, expected in sorted(counts.items()):
+                if max_depth is not None and depth > max_depth:
+                    break
+                board, color = from_notation(position, BACKENDS[backend])
+                start = time.perf_counter()
+                nodes = perft(board, color, depth)
+                seconds = time.perf_counter() - start
+                status = "ok" if nodes == expected else f"MISMATCH (expected {expected})"
+                ok = ok and nodes == expected
+                report(
+                    f"{backend:8} {name:10} depth {depth}: {nodes:>10} nodes "
+                    f"{seconds:8.3f}s {nodes / max(seconds, 1e-9):>10.0f} nodes/s  {status}"
+                )
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), action="append",
+                        help="Backend to test; may be repeated (default: all)")
+    parser.add_argument("--depth", type=int, help="Deepest depth to run")
+    parser.add_argument("--position", help="Count this position instead of the stored ones (needs --depth)")
+    parser.add_argument("--divide", action="store_true", help="With --position, print the count of each root move")
+    args = parser.parse_args(argv)
+    backends = args.backend or sorted(BACKENDS)
+
+    if args.position is None:
+        return 0 if run_suite(backends, args.depth) else 1
+
+    if args.depth is None:
+        parser.error("--position needs --depth")
+    for backend in backends:
+        board, color = from_notation(args.position, BACKENDS[backend])
+        start = time.perf_counter()
+        if args.divide:
+            counts = divide(board, color, args.depth)
+            for move, nodes in sorted(counts.items()):
+                print(f"{move}: {nodes}")
+            nodes = sum(counts.values())
+        else:
+            nodes = perft(board, color, args.depth)
+        seconds = time.perf_counter() - start
+        print(f"{backend}: {nodes} nodes in {seconds:.3f}s ({nodes / max(seconds, 1e-9):.0f} nodes/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
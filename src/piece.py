@@ -1,39 +1,30 @@
-from .constant import RED, BLACK_PIECES, square_size
-import pygame
+class Piece:
+    """
+    A man or king on a Board.
 
+    Only the square and the color/king flags are kept; screen coordinates are
+    worked out by the GUI when the piece is drawn.
 
-crown = pygame.transform.scale(pygame.image.load("assets/crown.png"), (45, 25))
+    The square stays on the piece although the board's grid also records it:
+    `get_valid_moves(piece)`, the move tuples and undo records of the search, the
+    captured lists and the GUI's selection all address a piece by its row and
+    column. Board._relocate and Board.unmake_move keep the two in step.
+    """
 
-class Piece: 
-    def __init__(self,row,col,color):
+    __slots__ = ("row", "col", "color", "king")
+
+    def __init__(self, row, col, color, king=False):
         self.row = row
-        self.color = color
         self.col = col
-        self.king = False
-
-        if self.color == RED:
-            self.direction = -1
-        else:
-            self.direction = 1
-
-        self.x = 0
-        self.y = 0
-        self.calc_pos()
-
-    def calc_pos(self):
-        self.x = square_size * self.col + square_size // 2
-        self.y = square_size * self.row + square_size // 2
+        self.color = color
+        self.king = king
 
     def move(self, new_row, new_col):
         self.row = new_row
         self.col = new_col
-        self.calc_pos()
 
     def define_king(self):
         self.king = True
 
-    def draw(self, win):
-        radius = square_size // 2 - 10
-        pygame.draw.circle(win, self.color, (self.x, self.y), radius)
-        if self.king:
-            win.blit(crown, (self.x - crown.get_width() // 2, self.y - crown.get_height() // 2))
+    def copy(self):
+        return Piece(self.row, self.col, self.color, self.king)
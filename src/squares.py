@@ -0,0 +1,58 @@
+from src.constant import ROWS, COLS
+
+# Only the dark squares ((row + col) odd) are playable, four per row.
+NUM_SQUARES = (ROWS * COLS) // 2
+
+
+def square_of(row, col):
+    """
+    Convert a board coordinate to its playable-square index.
+
+    Args:
+        row (int): The row of a dark square.
+        col (int): The column of a dark square.
+
+    Returns:
+        int: The index (0-31) of the square, counted row by row from the top-left.
+    """
+
+    return row * 4 + col // 2
+
+
+def row_col_of(square):
+    """
+    Convert a playable-square index back to a board coordinate.
+
+    Args:
+        square (int): The index (0-31) of a playable square.
+
+    Returns:
+        tuple: The (row, col) of the square on the 8x8 board.
+    """
+
+    row = square >> 2
+    col = 2 * (square & 3) + (1 if row % 2 == 0 else 0)
+    return row, col
+
+
+SQUARE_ROW_COL = [row_col_of(square) for square in range(NUM_SQUARES)]
+
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = range(4)
+UP_DIRECTIONS = (UP_LEFT, UP_RIGHT)
+DOWN_DIRECTIONS = (DOWN_LEFT, DOWN_RIGHT)
+_STEPS = {UP_LEFT: (-1, -1), UP_RIGHT: (-1, 1), DOWN_LEFT: (1, -1), DOWN_RIGHT: (1, 1)}
+
+
+def _step(square, direction, distance):
+    row, col = SQUARE_ROW_COL[square]
+    row += _STEPS[direction][0] * distance
+    col += _STEPS[direction][1] * distance
+    if 0 <= row < ROWS and 0 <= col < COLS:
+        return square_of(row, col)
+    return None
+
+
+# NEIGHBORS[square][direction] is the adjacent square in that direction and
+# JUMPS[square][direction] the square behind it, or None off the board.
+NEIGHBORS = [[_step(square, direction, 1) for direction in range(4)] for square in range(NUM_SQUARES)]
+JUMPS = [[_step(square, direction, 2) for direction in range(4)] for square in range(NUM_SQUARES)]
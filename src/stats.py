@@ -0,0 +1,100 @@
+import json
+import time
+
+
+class DepthStats:
+    """Counters of one iterative-deepening iteration."""
+
+    __slots__ = (
+        "depth", "nodes", "leaves", "evaluations", "cutoffs", "first_move_cutoffs",
+        "tt_probes", "tt_hits", "elapsed", "completed", "score",
+    )
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.nodes = 0
+        self.leaves = 0
+        self.evaluations = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0  # Cutoffs caused by the first move searched at a node
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.elapsed = 0.0
+        self.completed = False
+        self.score = None  # Root score, set when the iteration completes
+
+    def first_move_cutoff_ratio(self):
+        """Share of the cutoffs produced by the first move in the ordering."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        """Return the counters and the derived rates as a JSON-serializable dict."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["first_move_cutoff_ratio"] = self.first_move_cutoff_ratio()
+        data["nodes_per_second"] = self.nodes_per_second()
+        return data
+
+
+class SearchStats:
+    """
+    Opt-in statistics of one search, per iteration.
+
+    Pass an instance to `iterative_deepening_minimax`; the search then counts into
+    `current` as it goes. When no instance is given the search skips every count.
+    """
+
+    def __init__(self):
+        self.depths = []
+        self.current = None
+        self._started = None
+        self._table = None
+        self._table_counts = (0, 0)
+
+    def start_depth(self, depth, table=None):
+        """
+        Begin counting an iteration.
+
+        Args:
+            depth (int): The iteration's depth.
+            table (TranspositionTable): Table whose probe and hit counters are attributed to the iteration.
+        """
+
+        self.current = DepthStats(depth)
+        self.depths.append(self.current)
+        self._table = table
+        if table is not None:
+            self._table_counts = (table.probes, table.hits)
+        self._started = time.perf_counter()
+
+    def finish_depth(self, completed=True):
+        """Close the current iteration; `completed` is False when it was cut off by the clock."""
+        current = self.current
+        current.elapsed = time.perf_counter() - self._started
+        current.completed = completed
+        if self._table is not None:
+            current.tt_probes = self._table.probes - self._table_counts[0]
+            current.tt_hits = self._table.hits - self._table_counts[1]
+
+    def total_nodes(self):
+        return sum(depth.nodes for depth in self.depths)
+
+    def to_json_lines(self, **fields):
+        """
+        Return one JSON object per iteration, one per line.
+
+        Args:
+            **fields: Extra values added to every line, e.g. a game or move number.
+
+        Returns:
+            str: The JSON lines, each ending in a newline.
+        """
+
+        return "".join(json.dumps({**fields, **depth.to_dict()}) + "\n" for depth in self.depths)
+
+    def write_jsonl(self, path, **fields):
+        """Append the iterations to a JSON lines file; see `to_json_lines`."""
+        with open(path, "a") as file:
+            file.write(self.to_json_lines(**fields))
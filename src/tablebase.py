@@ -0,0 +1,562 @@
+import mmap
+import os
+import struct
+from array import array
+from collections import OrderedDict, defaultdict, namedtuple
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+from src.bitboard import BitBoard, ROW_0, ROW_7
+from src.constant import RED, BLACK_PIECES
+from src.squares import NUM_SQUARES, square_of
+
+# Game-theoretic value for the side to move; INVALID marks index slots that are not a legal position
+INVALID, DRAW, WIN, LOSS = range(4)
+
+Signature = namedtuple("Signature", ["red_men", "red_kings", "black_men", "black_kings"])
+
+Table = namedtuple("Table", ["index", "values", "distances"])
+
+# A man is promoted as soon as it reaches a back row, so men never stand on the row they promote on
+RED_MAN_SQUARES = tuple(square for square in range(NUM_SQUARES) if not (1 << square) & ROW_7)
+BLACK_MAN_SQUARES = tuple(square for square in range(NUM_SQUARES) if not (1 << square) & ROW_0)
+ALL_SQUARES = tuple(range(NUM_SQUARES))
+
+
+def signature_of(red, black, kings):
+    """
+    Return the material signature of a position given as bit masks.
+
+    Args:
+        red (int): Mask of the red pieces.
+        black (int): Mask of the black pieces.
+        kings (int): Mask of the kings of both colors.
+
+    Returns:
+        Signature: The piece counts of the position.
+    """
+
+    return Signature(
+        (red & ~kings).bit_count(),
+        (red & kings).bit_count(),
+        (black & ~kings).bit_count(),
+        (black & kings).bit_count(),
+    )
+
+
+def signature_name(signature):
+    """Return a short name for a signature, e.g. "r1k1b2k0" for one red man, one red king and two black men."""
+    return "r{}k{}b{}k{}".format(*signature)
+
+
+class _Group:
+    """
+    Combinatorial ranking of the sets of `count` squares taken from `squares`.
+
+    A set p1 < p2 < ... < pk of positions in `squares` has the colexicographic
+    rank C(p1, 1) + C(p2, 2) + ... + C(pk, k), which numbers the sets 0..C(n, k)-1.
+    """
+
+    def __init__(self, squares, count):
+        self.count = count
+        self.size = comb(len(squares), count)
+        self.position = {square: position for position, square in enumerate(squares)}
+        self.masks = [0] * self.size
+        for positions in combinations(range(len(squares)), count):
+            mask = 0
+            for position in positions:
+                mask |= 1 << squares[position]
+            self.masks[self._rank_positions(positions)] = mask
+
+    @staticmethod
+    def _rank_positions(positions):
+        return sum(comb(position, i + 1) for i, position in enumerate(positions))
+
+    def rank(self, mask):
+        """Return the rank of a set of squares given as a mask."""
+        rank = 0
+        i = 0
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            i += 1
+            rank += comb(self.position[bit.bit_length() - 1], i)
+        return rank
+
+
+@lru_cache(maxsize=None)
+def _group(squares, count):
+    return _Group(squares, count)
+
+
+class TableIndex:
+    """
+    Maps the positions of one material signature to consecutive integers and back.
+
+    The index combines the ranks of the red men, black men, red kings and black kings
+    square sets with the side to move. Slots whose groups overlap are not positions
+    and are reported as None by `position`.
+    """
+
+    def __init__(self, signature):
+        self.signature = Signature(*signature)
+        self.red_men = _group(RED_MAN_SQUARES, signature.red_men)
+        self.black_men = _group(BLACK_MAN_SQUARES, signature.black_men)
+        self.red_kings = _group(ALL_SQUARES, signature.red_kings)
+        self.black_kings = _group(ALL_SQUARES, signature.black_kings)
+        self.size = self.red_men.size * self.black_men.size * self.red_kings.size * self.black_kings.size * 2
+
+    def __reduce__(self):
+        # Rebuilt from the signature on unpickling; the rank tables are cached per process
+        return TableIndex, (self.signature,)
+
+    def index(self, red, black, kings, black_to_move):
+        """
+        Return the index of a position of this signature.
+
+        Args:
+            red (int): Mask of the red pieces.
+            black (int): Mask of the black pieces.
+            kings (int): Mask of the kings.
+            black_to_move (bool): True if black is the side to move.
+
+        Returns:
+            int: The position's slot in the table.
+        """
+
+        rank = self.red_men.rank(red & ~kings)
+        rank = rank * self.black_men.size + self.black_men.rank(black & ~kings)
+        rank = rank * self.red_kings.size + self.red_kings.rank(red & kings)
+        rank = rank * self.black_kings.size + self.black_kings.rank(black & kings)
+        return rank * 2 + (1 if black_to_move else 0)
+
+    def position(self, index):
+        """
+        Return the position stored at an index.
+
+        Args:
+            index (int): A slot of the table.
+
+        Returns:
+            tuple: `(red, black, kings, black_to_move)` masks, or None if the slot is not a legal position.
+        """
+
+        rank, side = divmod(index, 2)
+        rank, black_kings = divmod(rank, self.black_kings.size)
+        rank, red_kings = divmod(rank, self.red_kings.size)
+        red_men, black_men = divmod(rank, self.black_men.size)
+        masks = (
+            self.red_men.masks[red_men],
+            self.black_men.masks[black_men],
+            self.red_kings.masks[red_kings],
+            self.black_kings.masks[black_kings],
+        )
+        occupied = 0
+        for mask in masks:
+            if occupied & mask:
+                return None
+            occupied |= mask
+        red = masks[0] | masks[2]
+        black = masks[1] | masks[3]
+        return red, black, masks[2] | masks[3], side == 1
+
+
+def material_signatures(max_pieces):
+    """
+    List every signature with both colors present and at most `max_pieces` pieces.
+
+    Returns:
+        list: The signatures ordered so that each one comes after every signature it can convert into.
+    """
+
+    signatures = []
+    for red_men in range(max_pieces):
+        for red_kings in range(max_pieces - red_men):
+            for black_men in range(max_pieces - red_men - red_kings + 1):
+                for black_kings in range(max_pieces - red_men - red_kings - black_men + 1):
+                    signature = Signature(red_men, red_kings, black_men, black_kings)
+                    if red_men + red_kings and black_men + black_kings:
+                        signatures.append(signature)
+    signatures.sort(key=solve_order)
+    return signatures
+
+
+def solve_order(signature):
+    """
+    Sort key under which captures (fewer pieces) and promotions (fewer men) always lead to earlier signatures.
+
+    Signatures with the same key never convert into each other and can be solved in parallel.
+    """
+
+    return sum(signature), signature.red_men + signature.black_men
+
+
+def dependencies(signature):
+    """
+    Return the signatures a single move from `signature` can lead to, other than itself.
+
+    A move can promote one of the mover's men and capture any of the opponent's pieces.
+    """
+
+    red_men, red_kings, black_men, black_kings = signature
+    result = set()
+    for mover_promotes in (0, 1):
+        for lost_men in range(black_men + 1):
+            for lost_kings in range(black_kings + 1):
+                if red_men >= mover_promotes:
+                    result.add(Signature(
+                        red_men - mover_promotes, red_kings + mover_promotes,
+                        black_men - lost_men, black_kings - lost_kings,
+                    ))
+        for lost_men in range(red_men + 1):
+            for lost_kings in range(red_kings + 1):
+                if black_men >= mover_promotes:
+                    result.add(Signature(
+                        red_men - lost_men, red_kings - lost_kings,
+                        black_men - mover_promotes, black_kings + mover_promotes,
+                    ))
+    result.discard(Signature(*signature))
+    return sorted(s for s in result if s.red_men + s.red_kings and s.black_men + s.black_kings)
+
+
+def successors(board, black_to_move):
+    """
+    Generate the positions reachable in one move, using the engine's move rules.
+
+    Args:
+        board (BitBoard): The position; it is restored before returning.
+        black_to_move (bool): True if black is the side to move.
+
+    Returns:
+        list: `(red, black, kings)` masks of every child position.
+    """
+
+    children = []
+    for piece in board.get_pieces_by_color(BLACK_PIECES if black_to_move else RED):
+        for end_pos, captured in board.get_valid_moves(piece).items():
+            undo = board.make_move(piece, end_pos, captured)
+            children.append((board.red, board.black, board.kings))
+            board.unmake_move(undo)
+    return children
+
+
+def probe_table(tables, red, black, kings, black_to_move):
+    """
+    Look up a position in a dict of solved tables.
+
+    Returns:
+        tuple: `(value, distance)` for the side to move; a side without pieces has lost in 0 plies.
+    """
+
+    if not (black if black_to_move else red):
+        return LOSS, 0
+    if not (red if black_to_move else black):
+        return WIN, 0
+    table = tables[signature_of(red, black, kings)]
+    index = table.index.index(red, black, kings, black_to_move)
+    return table.values[index], table.distances[index]
+
+
+def solve_signature(signature, solved):
+    """
+    Solve every position of one signature by retrograde analysis.
+
+    Each position's moves are generated once. Moves into other signatures are
+    resolved from `solved`; moves inside the signature become edges of a graph
+    that is then solved backwards from the lost positions, in order of distance,
+    so every win is the fastest one and every loss the slowest. Positions never
+    reached that way are draws.
+
+    Args:
+        signature (Signature): The material to solve.
+        solved (dict): Solved tables of every signature in `dependencies(signature)`.
+
+    Returns:
+        Table: Values and distances (in plies) for the side to move, indexed by a TableIndex.
+    """
+
+    index = TableIndex(signature)
+    size = index.size
+    values = array("B", bytes(size))
+    distances = array("H", bytes(2 * size))
+    remaining = array("H", bytes(2 * size))  # children not yet known to be won by the opponent
+    longest_win = array("H", bytes(2 * size))  # slowest opponent win among those children
+    edge_children = array("I")
+    edge_parents = array("I")
+    buckets = defaultdict(list)  # distance -> [(index, value)]
+
+    board = BitBoard()
+    for position_index in range(size):
+        position = index.position(position_index)
+        if position is None:
+            continue
+        red, black, kings, black_to_move = position
+        values[position_index] = DRAW
+        board.red, board.black, board.kings = red, black, kings
+        children = successors(board, black_to_move)
+        if not children:
+            buckets[0].append((position_index, LOSS))
+            continue
+        unresolved = len(children)
+        fastest_win = None
+        for child_red, child_black, child_kings in children:
+            if signature_of(child_red, child_black, child_kings) == index.signature:
+                edge_children.append(index.index(child_red, child_black, child_kings, not black_to_move))
+                edge_parents.append(position_index)
+                continue
+            value, distance = probe_table(solved, child_red, child_black, child_kings, not black_to_move)
+            if value == LOSS:
+                if fastest_win is None or distance + 1 < fastest_win:
+                    fastest_win = distance + 1
+            elif value == WIN:
+                unresolved -= 1
+                longest_win[position_index] = max(longest_win[position_index], distance)
+        remaining[position_index] = unresolved
+        if fastest_win is not None:
+            buckets[fastest_win].append((position_index, WIN))
+        elif unresolved == 0:
+            buckets[longest_win[position_index] + 1].append((position_index, LOSS))
+
+    # Predecessor lists in compressed form: parents of child c are parents[starts[c]:starts[c + 1]]
+    starts = array("I", bytes(4 * (size + 1)))
+    for child in edge_children:
+        starts[child + 1] += 1
+    for i in range(size):
+        starts[i + 1] += starts[i]
+    fill = array("I", starts)
+    parents = array("I", bytes(4 * len(edge_children)))
+    for child, parent in zip(edge_children, edge_parents):
+        parents[fill[child]] = parent
+        fill[child] += 1
+    del edge_children, edge_parents, fill
+
+    done = bytearray(size)
+    distance = 0
+    while buckets:
+        for position_index, value in buckets.pop(distance, ()):
+            if done[position_index]:
+                continue
+            done[position_index] = 1
+            values[position_index] = value
+            distances[position_index] = distance
+            for parent in parents[starts[position_index]:starts[position_index + 1]]:
+                if done[parent]:
+                    continue
+                if value == LOSS:
+                    buckets[distance + 1].append((parent, WIN))
+                else:
+                    remaining[parent] -= 1
+                    longest_win[parent] = max(longest_win[parent], distance)
+                    if remaining[parent] == 0:
+                        buckets[longest_win[parent] + 1].append((parent, LOSS))
+        distance += 1
+
+    return Table(index, values, distances)
+
+
+# Table files: a header naming the signature, then one byte per index slot holding
+# the value in the low two bits and the distance in plies (capped) in the upper six.
+FILE_MAGIC = b"CKTB"
+FILE_HEADER = struct.Struct("<4s4B")
+FILE_SUFFIX = ".tb"
+MAX_FILE_DISTANCE = 63
+
+# Solver working files: the same header, then the values and the full distances as arrays
+SOLUTION_MAGIC = b"CKSV"
+SOLUTION_SUFFIX = ".solution"
+
+# Score of a won position for the side that wins; faster wins score higher
+WIN_SCORE = 10000
+
+
+def table_path(directory, signature):
+    """Return the path of a signature's table file inside `directory`."""
+    return os.path.join(directory, signature_name(signature) + FILE_SUFFIX)
+
+
+def write_table(directory, table):
+    """
+    Write a solved table as a bit-packed file that Tablebase can memory-map.
+
+    Args:
+        directory (str): Directory holding the table files; created if needed.
+        table (Table): The table to write.
+
+    Returns:
+        str: The path of the written file.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    packed = bytearray(table.index.size)
+    for index, value in enumerate(table.values):
+        if value != INVALID:
+            packed[index] = value | min(table.distances[index], MAX_FILE_DISTANCE) << 2
+    path = table_path(directory, table.index.signature)
+    with open(path + ".tmp", "wb") as file:
+        file.write(FILE_HEADER.pack(FILE_MAGIC, *table.index.signature))
+        file.write(packed)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def solution_path(directory, signature):
+    """Return the path of a signature's solution file inside `directory`."""
+    return os.path.join(directory, signature_name(signature) + SOLUTION_SUFFIX)
+
+
+def save_solution(directory, table):
+    """
+    Save a table with exact distances so later signatures can be solved against it.
+
+    The table files written by `write_table` cap the distance, so the solver keeps
+    its own copy of every table until the run is over.
+
+    Args:
+        directory (str): Directory holding the solution files; created if needed.
+        table (Table): The solved table.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    path = solution_path(directory, table.index.signature)
+    with open(path + ".tmp", "wb") as file:
+        file.write(FILE_HEADER.pack(SOLUTION_MAGIC, *table.index.signature))
+        table.values.tofile(file)
+        table.distances.tofile(file)
+    os.replace(path + ".tmp", path)  # A solution file is either complete or absent
+
+
+def load_solution(directory, signature):
+    """
+    Load a table saved by `save_solution`, or return None if there is none.
+
+    Returns:
+        Table: The solved table.
+    """
+
+    path = solution_path(directory, signature)
+    if not os.path.exists(path):
+        return None
+    index = TableIndex(signature)
+    values = array("B")
+    distances = array("H")
+    with open(path, "rb") as file:
+        file.seek(FILE_HEADER.size)
+        values.fromfile(file, index.size)
+        distances.fromfile(file, index.size)
+    return Table(index, values, distances)
+
+
+def position_masks(board):
+    """Return the `(red, black, kings)` masks of a Board or BitBoard."""
+    if isinstance(board, BitBoard):
+        return board.red, board.black, board.kings
+    red = black = kings = 0
+    for piece in board.get_all_pieces():
+        bit = 1 << square_of(piece.row, piece.col)
+        if piece.color == RED:
+            red |= bit
+        else:
+            black |= bit
+        if piece.king:
+            kings |= bit
+    return red, black, kings
+
+
+class Tablebase:
+    """
+    Read access to a directory of table files written by `write_table`.
+
+    Each file is memory-mapped, so a probe is an index computation and a single
+    byte read. Recent probes are kept in a small LRU cache in front of the files.
+    """
+
+    def __init__(self, directory, cache_size=4096):
+        """
+        Args:
+            directory (str): Directory holding the table files.
+            cache_size (int): Number of probe results kept in the LRU cache.
+        """
+
+        self.directory = directory
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.probes = 0
+        self.tables = {}
+        self._files = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(FILE_SUFFIX):
+                continue
+            with open(os.path.join(directory, name), "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, *counts = FILE_HEADER.unpack_from(data)
+            if magic != FILE_MAGIC:
+                data.close()
+                continue
+            self._files.append(data)
+            self.tables[Signature(*counts)] = (TableIndex(Signature(*counts)), data)
+
+        # Probes are only attempted with at most this many pieces, where every signature is present
+        self.max_pieces = 0
+        while all(s in self.tables for s in material_signatures(self.max_pieces + 1)):
+            self.max_pieces += 1
+
+    def close(self):
+        """Unmap the table files."""
+        self.tables = {}
+        for data in self._files:
+            data.close()
+        self._files = []
+
+    def probe(self, red, black, kings, black_to_move):
+        """
+        Look up a position given as masks.
+
+        Returns:
+            tuple: `(value, distance)` for the side to move, or None if its table is not loaded.
+        """
+
+        self.probes += 1
+        key = (red, black, kings, black_to_move)
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return result
+
+        entry = self.tables.get(signature_of(red, black, kings))
+        if entry is None:
+            return None
+        index, data = entry
+        packed = data[FILE_HEADER.size + index.index(red, black, kings, black_to_move)]
+        result = (packed & 3, packed >> 2)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def score(self, board, is_maximizing_player):
+        """
+        Return the search score of a position from the tables.
+
+        Args:
+            board (Board): The position; black, the maximizing side, scores positive.
+            is_maximizing_player (bool): True if black is to move.
+
+        Returns:
+            int: 0 for a draw, +/-(WIN_SCORE - distance) for a win, or None if the position is not covered.
+        """
+
+        if board.red_left + board.black_left > self.max_pieces or not board.red_left or not board.black_left:
+            return None
+        result = self.probe(*position_masks(board), is_maximizing_player)
+        if result is None:
+            return None
+        value, distance = result
+        if value == DRAW:
+            return 0
+        score = WIN_SCORE - distance
+        if (value == WIN) != is_maximizing_player:
+            score = -score
+        return score
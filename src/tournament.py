@@ -0,0 +1,510 @@
+"""
+Headless self-play matches between two engine configurations.
+
+Games are played from varied opening positions in a pool of worker processes;
+each opening is played twice with the colors swapped. The runner reports the
+win/draw/loss count of the first engine, the Elo difference with its error
+margin and a sequential probability ratio test (SPRT) that stops the match as
+soon as one hypothesis is accepted. Every finished game is appended as one JSON
+line to the results file.
+
+Engines are given as "name:option,option=value,...", with the options
+depth=N, time=SECONDS, bitboard, batch, tablebase=DIR, agent=minimax|ai and the
+search switches quiescence, lmr and history (history-only move ordering), and
+book=FILE to play from an opening book.
+
+Usage:
+    python -m src.tournament "new:depth=5,bitboard" "old:depth=4,bitboard" --games 2000 --workers 8
+    python -m src.tournament "fast:time=0.05" "slow:time=0.2" --sprt 0 20 --results match.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.agent import apply_move, get_all_moves
+from src.ai import AI_agent
+from src.constant import BLACK_PIECES, RED
+from src.game import Game
+from src.notation import START_POSITION, from_notation, to_notation
+from src.squares import square_of
+
+# Game lengths, in plies, after which a game is adjudicated a draw
+MAX_PLIES = 200
+NO_PROGRESS_PLIES = 80  # Plies without a capture or a man move
+REPETITIONS = 3  # Occurrences of the same position with the same side to move
+
+AGENTS = ("minimax", "ai")
+
+# Per-process engines, set up once by _init_worker
+_worker_games = None
+
+
+class EngineSpec:
+    """The name and search settings of one tournament player."""
+
+    def __init__(
+        self, name, depth=4, time_limit=None, use_bitboard=False, batch_evaluation=False,
+        tablebase_dir=None, agent="minimax", staged_ordering=True, quiescence=False, late_move_reductions=False,
+        book_path=None,
+    ):
+        """
+        Args:
+            name (str): Label used in reports and in the results file.
+            depth (int): Fixed search depth; ignored when `time_limit` is set.
+            time_limit (float): Seconds per move, or None to search to `depth`.
+            use_bitboard (bool): Search on BitBoard copies of the board.
+            batch_evaluation (bool): Evaluate depth-1 leaves in NumPy batches.
+            tablebase_dir (str): Directory of endgame tables to probe, or None.
+            agent (str): "minimax" for the iterative-deepening engine, "ai" for AI_agent.
+            staged_ordering (bool): Use the staged move ordering rather than history scores alone.
+            quiescence (bool): Extend the horizon with a capture search.
+            late_move_reductions (bool): Search late quiet moves shallower first.
+            book_path (str): Opening book file consulted before searching, or None.
+        """
+
+        if agent not in AGENTS:
+            raise ValueError(f"Unknown agent {agent!r}")
+        self.name = name
+        self.depth = depth
+        self.time_limit = time_limit
+        self.use_bitboard = use_bitboard
+        self.batch_evaluation = batch_evaluation
+        self.tablebase_dir = tablebase_dir
+        self.agent = agent
+        self.staged_ordering = staged_ordering
+        self.quiescence = quiescence
+        self.late_move_reductions = late_move_reductions
+        self.book_path = book_path
+
+    def create_game(self):
+        """Return a Game configured for this engine."""
+        game = Game(
+            use_bitboard=self.use_bitboard, time_limit=self.time_limit,
+            tablebase_dir=self.tablebase_dir, batch_evaluation=self.batch_evaluation,
+            staged_ordering=self.staged_ordering, quiescence=self.quiescence,
+            late_move_reductions=self.late_move_reductions, book_path=self.book_path,
+        )
+        game.search_depth = self.depth
+        return game
+
+    def limit(self):
+        return f"{self.time_limit}s/move" if self.time_limit is not None else f"depth {self.depth}"
+
+
+def parse_engine(text):
+    """
+    Read an engine given as "name:option,option=value,...".
+
+    Returns:
+        EngineSpec: The engine.
+
+    Raises:
+        ValueError: If an option is unknown or has a bad value.
+    """
+
+    name, _, options = text.partition(":")
+    settings = {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key == "depth":
+            settings["depth"] = int(value)
+        elif key == "time":
+            settings["time_limit"] = float(value)
+        elif key == "bitboard":
+            settings["use_bitboard"] = True
+        elif key == "batch":
+            settings["batch_evaluation"] = True
+        elif key == "tablebase":
+            settings["tablebase_dir"] = value
+        elif key == "history":
+            settings["staged_ordering"] = False
+        elif key == "quiescence":
+            settings["quiescence"] = True
+        elif key == "lmr":
+            settings["late_move_reductions"] = True
+        elif key == "book":
+            settings["book_path"] = value
+        elif key == "agent":
+            settings["agent"] = value
+        else:
+            raise ValueError(f"Unknown engine option {key!r} in {text!r}")
+    return EngineSpec(name, **settings)
+
+
+def random_openings(count, plies=4, seed=1):
+    """
+    Build distinct opening positions by playing random legal moves from the start.
+
+    Args:
+        count (int): How many openings to return.
+        plies (int): Random plies played from the start position.
+        seed (int): Seed for the random move choices.
+
+    Returns:
+        list: Positions in the notation of src.notation.
+    """
+
+    rng = random.Random(seed)
+    context = Game()
+    openings = []
+    seen = set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 100:
+        attempts += 1
+        board, turn = from_notation(START_POSITION)
+        for _ in range(plies):
+            moves = get_all_moves(board, turn, context)
+            if not moves:
+                break
+            piece, end_pos, skipped, _, _ = rng.choice(moves)
+            board.make_move(piece, end_pos, skipped)
+            turn = BLACK_PIECES if turn == RED else RED
+        position = to_notation(board, turn)
+        if position not in seen and board.winner() is None and get_all_moves(board, turn, context):
+            seen.add(position)
+            openings.append(position)
+    return openings
+
+
+def _piece_squares(board):
+    return {
+        square_of(piece.row, piece.col): piece
+        for piece in board.get_all_pieces()
+    }
+
+
+def describe_move(before, after, color):
+    """
+    Work out the move that turned `before` into `after`.
+
+    Returns:
+        tuple: `(text, progress)`, where text is "start-end" or "startxend" in 0-31
+        square numbers and progress is True for a capture or a man move.
+    """
+
+    old = _piece_squares(before)
+    new = _piece_squares(after)
+    start = next(s for s, piece in old.items() if piece.color == color and (s not in new or new[s].color != color))
+    end = next(s for s, piece in new.items() if piece.color == color and (s not in old or old[s].color != color))
+    captured = any(piece.color != color and s not in new for s, piece in old.items())
+    return f"{start}{'x' if captured else '-'}{end}", captured or not old[start].king
+
+
+def choose_move(spec, game, board, color, ply=0):
+    """
+    Let an engine pick its move.
+
+    `ply` is the number of plies played in the game so far, which decides whether
+    the engine may still use its opening book.
+
+    Returns:
+        Board: A new board after the move, or None if the engine has no move.
+    """
+
+    game.turn = color
+    game.ply = ply
+    if spec.agent == "minimax":
+        return game.find_agent_move(board=board)
+
+    game.board = board
+    move = AI_agent(color, spec.depth).choose_move(game)
+    if move is None:
+        return None
+    start, end_pos = move
+    piece = board.get_piece(*start)
+    return apply_move(board, (piece, end_pos, board.get_valid_moves(piece)[end_pos], 0, None))
+
+
+def play_game(engines, games, opening, red_index):
+    """
+    Play one game from an opening position.
+
+    Args:
+        engines (list): The two EngineSpecs.
+        games (list): A Game per engine, reused from game to game.
+        opening (str): The start position in notation.
+        red_index (int): Index of the engine playing red.
+
+    Returns:
+        dict: The game record: the opening, the engine names, the result ("red",
+        "black" or "draw"), why the game ended, the moves and the plies played.
+    """
+
+    board, turn = from_notation(opening)
+    players = {RED: red_index, BLACK_PIECES: 1 - red_index}
+    for game in games:
+        game.history_scores.clear()
+        game.transposition_table.clear()
+
+    moves = []
+    seen = {}
+    quiet_plies = 0
+    result = termination = None
+    while result is None:
+        winner = board.winner()
+        if winner is not None:
+            result, termination = ("red" if winner == RED else "black"), "material"
+            break
+        position = (board.hash, turn)
+        seen[position] = seen.get(position, 0) + 1
+        if seen[position] >= REPETITIONS:
+            result, termination = "draw", "repetition"
+            break
+        if quiet_plies >= NO_PROGRESS_PLIES:
+            result, termination = "draw", "no progress"
+            break
+        if len(moves) >= MAX_PLIES:
+            result, termination = "draw", "move cap"
+            break
+
+        index = players[turn]
+        after = choose_move(engines[index], games[index], board, turn, len(moves))
+        if after is None:
+            # The side to move is blocked and loses
+            result, termination = ("black" if turn == RED else "red"), "no moves"
+            break
+        text, progress = describe_move(board, after, turn)
+        moves.append(text)
+        quiet_plies = 0 if progress else quiet_plies + 1
+        board = after
+        turn = BLACK_PIECES if turn == RED else RED
+
+    return {
+        "opening": opening,
+        "red": engines[red_index].name,
+        "black": engines[1 - red_index].name,
+        "result": result,
+        "termination": termination,
+        "plies": len(moves),
+        "moves": " ".join(moves),
+    }
+
+
+def _init_worker(engines):
+    global _worker_games
+    _worker_games = [engine.create_game() for engine in engines]
+
+
+def _play(engines, opening, red_index):
+    return play_game(engines, _worker_games, opening, red_index)
+
+
+def expected_score(elo):
+    """Expected score of a player rated `elo` points above its opponent."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_difference(score):
+    """Elo difference that corresponds to an expected score in (0, 1)."""
+    return -400 * math.log10(1 / score - 1)
+
+
+class MatchResult:
+    """Win, draw and loss counts of the first engine, with Elo and SPRT estimates."""
+
+    def __init__(self):
+        self.wins = self.draws = self.losses = 0
+
+    def record(self, score):
+        """Count one game scored 1, 0.5 or 0 for the first engine."""
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def score(self):
+        return (self.wins + self.draws / 2) / self.games() if self.games() else 0.5
+
+    def _variance(self):
+        """Variance of the score of a single game."""
+        n = self.games()
+        mean = self.score()
+        return (
+            self.wins * (1 - mean) ** 2 + self.draws * (0.5 - mean) ** 2 + self.losses * mean ** 2
+        ) / n
+
+    def elo(self):
+        """
+        Estimate the Elo difference and its 95% confidence margin.
+
+        Returns:
+            tuple: `(elo, margin)`; infinite while one side has scored every point.
+        """
+
+        n = self.games()
+        score = self.score()
+        if score <= 0 or score >= 1:
+            return (math.inf if score >= 1 else -math.inf), math.inf
+        deviation = math.sqrt(self._variance() / n)
+        low = min(max(score - 1.96 * deviation, 1e-9), 1 - 1e-9)
+        high = min(max(score + 1.96 * deviation, 1e-9), 1 - 1e-9)
+        return elo_difference(score), (elo_difference(high) - elo_difference(low)) / 2
+
+    def llr(self, elo0, elo1):
+        """
+        Log-likelihood ratio of H1 (Elo difference `elo1`) against H0 (`elo0`).
+
+        Uses the normal approximation of the trinomial game outcome model.
+        """
+
+        n = self.games()
+        variance = self._variance() if n else 0
+        if variance == 0:
+            return 0.0
+        score0, score1 = expected_score(elo0), expected_score(elo1)
+        return n * (score1 - score0) * (2 * self.score() - score0 - score1) / (2 * variance)
+
+
+class SPRT:
+    """Sequential probability ratio test of Elo `elo0` against Elo `elo1`."""
+
+    def __init__(self, elo0=0.0, elo1=10.0, alpha=0.05, beta=0.05):
+        """
+        Args:
+            elo0 (float): Elo difference of the null hypothesis.
+            elo1 (float): Elo difference of the alternative hypothesis.
+            alpha (float): Chance of accepting H1 when H0 holds.
+            beta (float): Chance of accepting H0 when H1 holds.
+        """
+
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def status(self, result):
+        """
+        Decide the test on a MatchResult.
+
+        Returns:
+            str: "H1" or "H0" once a bound is crossed, otherwise None.
+        """
+
+        llr = result.llr(self.elo0, self.elo1)
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+
+def run_match(engines, openings, games, workers=None, results_path=None, sprt=None, report=print, report_every=20):
+    """
+    Play a match between two engines on a process pool.
+
+    Openings are used in order, each twice with the colors swapped, and cycled
+    when there are fewer than `games` / 2. At most two games per worker are in
+    flight, so the match can stop soon after the SPRT is decided.
+
+    Args:
+        engines (list): The two EngineSpecs; results are counted for the first.
+        openings (list): Start positions in notation.
+        games (int): Most games to play.
+        workers (int): Worker processes; defaults to the number of CPUs.
+        results_path (str): JSON lines file every game is appended to, or None.
+        sprt (SPRT): Stop rule, or None to play all the games.
+        report (callable): Called with one line of progress text.
+        report_every (int): Games between two progress lines.
+
+    Returns:
+        MatchResult: The counts of the games played.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    schedule = ((openings[(i // 2) % len(openings)], i % 2) for i in range(games))
+    result = MatchResult()
+    decision = None
+    start = time.perf_counter()
+    results_file = open(results_path, "a") if results_path else None
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(engines,)) as executor:
+            pending = set()
+            while True:
+                while decision is None and len(pending) < 2 * workers:
+                    task = next(schedule, None)
+                    if task is None:
+                        break
+                    pending.add(executor.submit(_play, engines, *task))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    first_color = "red" if record["red"] == engines[0].name else "black"
+                    result.record(0.5 if record["result"] == "draw" else float(record["result"] == first_color))
+                    if results_file:
+                        results_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    if sprt is not None and decision is None:
+                        decision = sprt.status(result)
+                    if result.games() % report_every == 0:
+                        report(progress_line(result, sprt, time.perf_counter() - start))
+                if decision is not None:
+                    # Finished games are still recorded; the rest are dropped
+                    for future in pending:
+                        future.cancel()
+                    pending = {future for future in pending if not future.cancelled()}
+    finally:
+        if results_file:
+            results_file.close()
+    report(progress_line(result, sprt, time.perf_counter() - start))
+    if decision is not None:
+        report(f"SPRT: {decision} accepted")
+    return result
+
+
+def progress_line(result, sprt, seconds):
+    """Format the score, Elo, LLR and throughput of a match in progress."""
+    elo, margin = result.elo()
+    line = (
+        f"games {result.games()}  +{result.wins} ={result.draws} -{result.losses}  "
+        f"elo {elo:+.1f} +/- {margin:.1f}"
+    )
+    if sprt is not None:
+        line += f"  llr {result.llr(sprt.elo0, sprt.elo1):.2f} ({sprt.lower:.2f}, {sprt.upper:.2f})"
+    return line + f"  {result.games() * 3600 / max(seconds, 1e-9):.0f} games/h"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("engines", nargs=2, type=parse_engine, help="The two engines; results are for the first")
+    parser.add_argument("--games", type=int, default=200, help="Most games to play")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--openings", help="File of start positions in notation, one per line")
+    parser.add_argument("--opening-plies", type=int, default=4, help="Random plies of generated openings")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the generated openings")
+    parser.add_argument("--results", help="JSON lines file receiving every game")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"),
+                        help="Stop once an SPRT of ELO0 against ELO1 is decided")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    if args.openings:
+        with open(args.openings) as file:
+            openings = [line.strip() for line in file if line.strip()]
+    else:
+        openings = random_openings((args.games + 1) // 2, args.opening_plies, args.seed)
+    for opening in openings:
+        from_notation(opening)  # Fail early on a bad position
+
+    sprt = SPRT(*args.sprt, args.alpha, args.beta) if args.sprt else None
+    engines = args.engines
+    if engines[0].name == engines[1].name:
+        parser.error("the engines need different names")
+    print(f"{engines[0].name} ({engines[0].limit()}) vs {engines[1].name} ({engines[1].limit()}), "
+          f"{len(openings)} openings")
+    run_match(engines, openings, args.games, args.workers, args.results, sprt)
+
+
+if __name__ == "__main__":
+    main()
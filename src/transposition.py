@@ -0,0 +1,110 @@
+from array import array
+
+from src.squares import SQUARE_ROW_COL, square_of
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+NO_MOVE = 0xFFFF
+
+# Bytes per slot: key (8) + score (8) + best move (2) + depth (1) + bound (1) + age (1).
+ENTRY_BYTES = 21
+
+
+def encode_move(move_key):
+    """Pack a (from_row, from_col, to_row, to_col) move key into 10 bits."""
+    return square_of(move_key[0], move_key[1]) * 32 + square_of(move_key[2], move_key[3])
+
+
+def decode_move(code):
+    """Inverse of encode_move."""
+    return SQUARE_ROW_COL[code >> 5] + SQUARE_ROW_COL[code & 31]
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist key.
+
+    Storage is a set of flat arrays sized once from `max_bytes`, so the table never
+    grows. When two positions share a slot the deeper search is kept, except that
+    entries left over from an earlier search are always replaced.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Upper bound for the memory used by the entries.
+        """
+
+        size = 1
+        while size * 2 * ENTRY_BYTES <= max_bytes:
+            size *= 2
+        self.size = size
+        self.mask = size - 1
+        self.keys = array("Q", bytes(8 * size))
+        self.scores = array("d", bytes(8 * size))
+        self.moves = array("H", [NO_MOVE]) * size
+        self.depths = array("b", [-1]) * size
+        self.bounds = array("B", bytes(size))
+        self.ages = array("B", bytes(size))
+        self.age = 0
+        self.hits = 0
+        self.probes = 0
+
+    def new_search(self):
+        """Mark existing entries as stale so the next search may overwrite them freely."""
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        """Drop every entry."""
+        self.__init__(self.size * ENTRY_BYTES)
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key (int): The Zobrist key of the position and side to move.
+
+        Returns:
+            tuple: `(depth, bound, score, move_key)` if the position is stored, otherwise None.
+        """
+
+        self.probes += 1
+        slot = key & self.mask
+        if self.depths[slot] < 0 or self.keys[slot] != key:
+            return None
+        self.hits += 1
+        code = self.moves[slot]
+        return (
+            self.depths[slot],
+            self.bounds[slot],
+            self.scores[slot],
+            None if code == NO_MOVE else decode_move(code),
+        )
+
+    def store(self, key, depth, bound, score, move_key):
+        """
+        Record a search result, keeping the deeper entry when the slot is taken.
+
+        Args:
+            key (int): The Zobrist key of the position and side to move.
+            depth (int): The remaining depth the position was searched to.
+            bound (int): EXACT, LOWER or UPPER.
+            score (float): The score found by the search.
+            move_key (tuple): The best move found, or None.
+        """
+
+        slot = key & self.mask
+        if (
+            self.depths[slot] >= 0
+            and self.keys[slot] != key
+            and self.ages[slot] == self.age
+            and self.depths[slot] > depth
+        ):
+            return
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.scores[slot] = score
+        self.moves[slot] = NO_MOVE if move_key is None else encode_move(move_key)
+        self.ages[slot] = self.age
@@ -0,0 +1,51 @@
+import random
+
+from src.constant import RED, BLACK_PIECES
+from src.squares import NUM_SQUARES, square_of
+
+_rng = random.Random(0x5EED)  # Fixed seed so keys are identical in every process
+
+# One key per (piece kind, square); kinds are red man, red king, black man, black king.
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in range(4)]
+
+# Key mixed in when black is the side to move.
+SIDE_KEY = _rng.getrandbits(64)
+
+# Board.evaluate scores the red_kings/black_kings counters rather than the kings on
+# the board, and those counters are not always equal, so they are part of the key.
+MAX_KING_COUNT = 64
+KING_COUNT_KEYS = [[_rng.getrandbits(64) for _ in range(MAX_KING_COUNT)] for _ in range(2)]
+
+
+def piece_kind(color, king):
+    """Return the PIECE_KEYS row for a piece of the given color and king status."""
+    return (0 if color == RED else 2) + (1 if king else 0)
+
+
+def piece_key(piece):
+    """Return the key of a piece standing on its current square."""
+    return PIECE_KEYS[piece_kind(piece.color, piece.king)][square_of(piece.row, piece.col)]
+
+
+def king_count_key(color, count):
+    """Return the key of a king counter value for the given color."""
+    return KING_COUNT_KEYS[0 if color == RED else 1][min(count, MAX_KING_COUNT - 1)]
+
+
+def hash_position(pieces, red_kings, black_kings):
+    """
+    Compute the key of a position from scratch.
+
+    Args:
+        pieces (list): Every piece on the board.
+        red_kings (int): The board's red king counter.
+        black_kings (int): The board's black king counter.
+
+    Returns:
+        int: The 64-bit Zobrist key, without the side-to-move key.
+    """
+
+    key = king_count_key(RED, red_kings) ^ king_count_key(BLACK_PIECES, black_kings)
+    for piece in pieces:
+        key ^= piece_key(piece)
+    return key
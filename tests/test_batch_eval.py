@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from src.agent import minimax
+from src.batch_eval import encode_position, evaluate_positions, stack_positions
+from src.bitboard import BitBoard
+from src.constant import BLACK_PIECES, RED
+from src.game import Game
+from src.notation import EMPTY_CHAR, PIECE_CHARS, from_notation
+from src.squares import NUM_SQUARES
+
+
+def random_position(rng):
+    """Return a random placement of men and kings, with a few random moves played on it."""
+    squares = [EMPTY_CHAR] * NUM_SQUARES
+    for square in rng.sample(range(NUM_SQUARES), rng.randint(2, 24)):
+        squares[square] = PIECE_CHARS[(rng.choice((RED, BLACK_PIECES)), rng.random() < 0.3)]
+    board, turn = from_notation(rng.choice("rb") + ":" + "".join(squares))
+    # Moves leave the king counters out of step with the kings on the board, as in a search
+    for _ in range(rng.randint(0, 10)):
+        moves = [
+            (piece, end_pos, captured)
+            for piece in board.get_pieces_by_color(turn)
+            for end_pos, captured in board.get_valid_moves(piece).items()
+        ]
+        if not moves:
+            break
+        board.make_move(*rng.choice(moves))
+        turn = BLACK_PIECES if turn == RED else RED
+    return board, turn
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batch_scores_match_board_and_bitboard(seed):
+    rng = random.Random(seed)
+    boards = [random_position(rng)[0] for _ in range(50)]
+    bitboards = [BitBoard.from_board(board) for board in boards]
+
+    scores = evaluate_positions(*stack_positions([encode_position(board) for board in boards])).tolist()
+    assert scores == [board.evaluate() for board in boards]
+    assert scores == [bitboard.evaluate() for bitboard in bitboards]
+    assert evaluate_positions(*stack_positions([encode_position(board) for board in bitboards])).tolist() == scores
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_minimax_score_is_the_same_with_batch_evaluation(seed):
+    board, turn = random_position(random.Random(seed))
+    is_maximizing_player = turn == BLACK_PIECES
+    depth = 3
+
+    scores = []
+    for batch_evaluation in (False, True):
+        game = Game(batch_evaluation=batch_evaluation)
+        game.turn = turn
+        score, _ = minimax(board, depth, float("-inf"), float("inf"), is_maximizing_player, game, depth)
+        scores.append(score)
+    assert scores[0] == scores[1]
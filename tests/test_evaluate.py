@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from src.board import Board
+from src.constant import BLACK_PIECES, COLS, RED, ROWS
+from src.notation import EMPTY_CHAR, PIECE_CHARS, from_notation
+from src.squares import NUM_SQUARES
+
+PLIES = 200
+
+
+def full_evaluation(board):
+    """
+    Score a board as Board.evaluate did before its terms were kept as running totals.
+
+    Every term is worked out from the grid, and mobility is counted with the original
+    recursive move search, so neither the positional table nor the move cache is used.
+    """
+
+    pieces = [piece for row in board.board for piece in row if piece is not None]
+    red = sum(1 for piece in pieces if piece.color == RED)
+    black = len(pieces) - red
+    assert (board.red_left, board.black_left) == (red, black)
+
+    # The king counters count promotions, not the kings on the board, and the evaluation uses them as they are
+    score = 100 * (black - red) + 170 * (board.black_kings - board.red_kings)
+    for piece in pieces:
+        score += 5 * len(_valid_moves(board.board, piece))
+        if 2 <= piece.col <= 5 and 2 <= piece.row <= 5:
+            score += 30
+        if piece.color == BLACK_PIECES and not piece.king:
+            if piece.row == ROWS - 2:
+                score += 72
+            if piece.row == ROWS - 1:
+                score += 30
+        elif piece.color == RED and not piece.king:
+            if piece.row == 1:
+                score += 72
+            if piece.row == 0:
+                score += 30
+        if (piece.color == BLACK_PIECES and piece.row == 0) or (piece.color == RED and piece.row == ROWS - 1):
+            score += 18
+    return score
+
+
+def _valid_moves(grid, piece):
+    moves = {}
+    row = piece.row
+    if piece.color == BLACK_PIECES or piece.king:
+        moves.update(_traverse(grid, row - 1, max(row - 3, -1), -1, piece.color, piece.col - 1, -1))
+        moves.update(_traverse(grid, row - 1, max(row - 3, -1), -1, piece.color, piece.col + 1, 1))
+    if piece.color == RED or piece.king:
+        moves.update(_traverse(grid, row + 1, min(row + 3, ROWS), 1, piece.color, piece.col - 1, -1))
+        moves.update(_traverse(grid, row + 1, min(row + 3, ROWS), 1, piece.color, piece.col + 1, 1))
+    return moves
+
+
+def _traverse(grid, start, stop, step, color, col, col_step, skipped=()):
+    """The original _traverse_left (col_step -1) and _traverse_right (col_step 1)."""
+    moves = {}
+    last = []
+    for r in range(start, stop, step):
+        if not 0 <= col < COLS:
+            break
+        current = grid[r][col]
+        if current is None:
+            if skipped and not last:
+                break
+            moves[(r, col)] = last + list(skipped)
+            if last:
+                next_row = max(r - 3, 0) if step == -1 else min(r + 3, ROWS)
+                moves.update(_traverse(grid, r + step, next_row, step, color, col - 1, -1, last))
+                moves.update(_traverse(grid, r + step, next_row, step, color, col + 1, 1, last))
+            break
+        elif current.color == color:
+            break
+        else:
+            last = [current]
+        col += col_step
+    return moves
+
+
+def random_position(rng):
+    squares = [EMPTY_CHAR] * NUM_SQUARES
+    for square in rng.sample(range(NUM_SQUARES), rng.randint(2, 24)):
+        squares[square] = PIECE_CHARS[(rng.choice((RED, BLACK_PIECES)), rng.random() < 0.3)]
+    return from_notation(rng.choice("rb") + ":" + "".join(squares))
+
+
+def random_moves(board, turn, rng):
+    """Play and take back random moves, checking the evaluation after every step."""
+    undos = []
+    for _ in range(PLIES):
+        moves = [
+            (piece, end_pos, captured)
+            for piece in board.get_pieces_by_color(turn)
+            for end_pos, captured in board.get_valid_moves(piece).items()
+        ]
+        if undos and (not moves or rng.random() < 0.3):
+            board.unmake_move(undos.pop())
+        elif moves:
+            undos.append(board.make_move(*rng.choice(moves)))
+        else:
+            break
+        turn = BLACK_PIECES if turn == RED else RED
+        assert board.positional_score == board.compute_positional_score()
+        assert board.hash == board.compute_hash()
+        assert board.evaluate() == full_evaluation(board)
+    return undos
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_evaluate_matches_rescan_from_start(seed):
+    board = Board()
+    start = board.evaluate()
+    for undo in reversed(random_moves(board, RED, random.Random(seed))):
+        board.unmake_move(undo)
+    assert board.evaluate() == start == full_evaluation(board)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_evaluate_matches_rescan_from_random_positions(seed):
+    rng = random.Random(seed)
+    board, turn = random_position(rng)
+    start = full_evaluation(board)
+    assert board.evaluate() == start
+    for undo in reversed(random_moves(board, turn, rng)):
+        board.unmake_move(undo)
+    assert board.evaluate() == start